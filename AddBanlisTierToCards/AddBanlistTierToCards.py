@@ -1,53 +1,68 @@
-import re
-
-# Mapping restriction levels to numbers
-BANLIST_MAPPING = {
-    "Forbidden": "0",
-    "Limited": "1",
-    "Semi-Limited": "2",
-    "Unlimited": "3"
-}
-
-def parse_banlist(banlist_file):
-    """Extracts card names and their restriction levels from the banlist file."""
-    banlist = {}
-    with open(banlist_file, "r", encoding="utf-8") as file:
-        for line in file:
-            parts = line.strip().split("\t")  # Assuming tab-separated values
-            if len(parts) >= 4:
-                card_name = parts[2].strip()
-                restriction = BANLIST_MAPPING.get(parts[3].strip(), "3")
-                banlist[card_name] = restriction
-    return banlist
+import argparse
+import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr import metrics
+from dmvr.banlist import parse_banlist
+from dmvr.conf import read_conf
+from dmvr.manifest import Manifest, diff_states
+from dmvr.names import NameIndex
+
+@metrics.timed("call_seconds", function="update_conf_file")
 def update_conf_file(conf_file, banlist):
-    """Updates a .conf file with new restriction levels based on the banlist."""
-    updated_lines = []
-    with open(conf_file, "r", encoding="utf-8") as file:
-        for line in file:
-            match = re.match(r"(\d+) \d # (.+),", line)
-            if match:
-                card_id, card_name = match.groups()
-                restriction = banlist.get(card_name, "3")  # Default to 3 (Unlimited)
-                updated_lines.append(f"{card_id} {restriction} # {card_name},\n")
-            else:
-                updated_lines.append(line)
-    
+    """
+    Updates a .conf file with new restriction levels based on the banlist.
+    Names are matched exactly or else through name_key(), so spelling variants of a card match.
+    The file is only rewritten if at least one line changed.
+    Returns {card_id: [restriction, card_name]} for the cards in the file.
+    """
+    conf = read_conf(conf_file)
+    restrictions = NameIndex(banlist)
+    cards = {}
+    changed = 0
+    for slot, card_name in enumerate(conf.names):
+        restriction = restrictions.get(card_name, "3")  # Default to 3 (Unlimited)
+        cards[conf.card_id(slot)] = [restriction, card_name]
+        if conf.restrictions[slot] != int(restriction):
+            conf.restrictions[slot] = int(restriction)
+            changed += 1
+
     # Write updated content back to file
-    with open(conf_file, "w", encoding="utf-8") as file:
-        file.writelines(updated_lines)
+    if changed:
+        conf.write(conf_file)
+    print(f"{conf_file}: {changed} lines changed.")
+    return cards
 
 def main():
+    parser = argparse.ArgumentParser(description="Write the Banlist.txt restriction levels into the colour .conf files.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip the run when Banlist.txt and the .conf files are unchanged since the last run")
+    args = parser.parse_args()
+
     banlist_file = "Banlist.txt"
     conf_files = ["OnlyWhiteCards.conf", "OnlyRedCards.conf", "OnlyBlueCards.conf"]
-    
+
+    manifest = Manifest() if args.incremental else None
+    if manifest and manifest.inputs_unchanged("banlist", [banlist_file] + conf_files):
+        print("Banlist and conf files are unchanged since the last run; nothing to do.")
+        return
+
     # Parse the banlist file
     banlist = parse_banlist(banlist_file)
     
     # Update each conf file
+    state = {}
     for conf_file in conf_files:
-        update_conf_file(conf_file, banlist)
-    
+        for card_id, (restriction, card_name) in update_conf_file(conf_file, banlist).items():
+            state[card_id] = [conf_file, restriction, card_name]
+
+    if manifest:
+        moved = diff_states(manifest.cards("banlist"), state)
+        print(f"{len(moved)} cards changed colour or restriction since the last run.")
+        manifest.record("banlist", [banlist_file] + conf_files, state)
+        manifest.save()
+
     print("Conf files updated successfully.")
 
 if __name__ == "__main__":
@@ -1,45 +1,42 @@
-import re
 import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr.conf import read_conf, read_ids
+from dmvr.partition import ColourPartition
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 def read_card_ids(file_path):
     """Reads card IDs from a .conf file and returns a set of IDs."""
-    card_ids = set()
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            for line in file:
-                match = re.match(r"(\d+) \d # (.+),", line)
-                if match:
-                    card_id = match.group(1).strip()
-                    card_ids.add(card_id)
+        return read_ids(file_path)
     except FileNotFoundError:
         logging.error(f"Error: {file_path} not found!")
-    return card_ids
+        return set()
 
-def remove_blue_from_white(blue_conf, white_conf):
-    """Removes any cards in Blue from White."""
-    blue_card_ids = read_card_ids(blue_conf)
-    updated_lines = []
+def remove_blue_from_white(blue_conf, white_conf, red_conf=None):
+    """Removes any cards in Blue (and Red, if given) from White; red and blue take precedence over white."""
     try:
-        with open(white_conf, "r", encoding="utf-8") as file:
-            for line in file:
-                match = re.match(r"(\d+) \d # (.+),", line)
-                if match and match.group(1).strip() in blue_card_ids:
-                    continue  # Skip Blue cards in White list
-                updated_lines.append(line.strip())
+        white = read_conf(white_conf)
     except FileNotFoundError:
         logging.error(f"Error: {white_conf} not found!")
         return
-    
-    with open(white_conf, "w", encoding="utf-8") as file:
-        file.write("\n".join(updated_lines) + "\n")
-    logging.info(f"Removed {len(blue_card_ids)} duplicate Blue cards from {white_conf}.")
+
+    lists = {"blue": read_card_ids(blue_conf), "white": white.id_set()}
+    if red_conf:
+        lists["red"] = read_card_ids(red_conf)
+    removed = ColourPartition(lists).removed("white")
+    filtered = white.filter(lambda entry: int(entry.card_id) not in removed)  # Skip Red/Blue cards in White list
+    filtered.write(white_conf)
+    logging.info(f"Removed {len(white) - len(filtered)} duplicate Red/Blue cards from {white_conf}.")
 
 # Define file paths
+red_conf = "OnlyRedCards.conf"
 blue_conf = "OnlyBlueCards.conf"
 white_conf = "OnlyWhiteCards.conf"
 
 # Run the cleanup
-remove_blue_from_white(blue_conf, white_conf)
+remove_blue_from_white(blue_conf, white_conf, red_conf)
@@ -1,78 +1,123 @@
-import sqlite3
+import argparse
 import logging
-import re
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr import metrics
+from dmvr.conf import read_entries
+from dmvr.manifest import Manifest
+from dmvr.partition import CONFLICTS_FILE, ColourPartition
+from dmvr.poolcdb import build_pool_cdb
+from dmvr.relabel import relabel_databases
+from dmvr.validate import validate_entries
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def read_card_ids(file_path):
-    """Reads card IDs from a .conf file and returns a set of IDs."""
-    card_ids = set()
+def read_card_entries(file_path):
+    """Reads the (card ID, restriction, name) entries of a .conf file."""
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            for line in file:
-                match = re.match(r"(\d+) \d # (.+),", line)
-                if match:
-                    card_id = match.group(1).strip()
-                    card_ids.add(card_id)
+        return read_entries(file_path)
     except FileNotFoundError:
         logging.error(f"Error: {file_path} not found!")
-    return card_ids
+        return []
 
-def update_card_labels(database_paths, red_conf, blue_conf, white_conf, error_log_file):
-    """Updates the OT field in the databases based on card IDs from .conf files."""
-    # Read card IDs instead of names
-    red_card_ids = read_card_ids(red_conf)   # Should be OT = 8 (ILLEGAL)
-    blue_card_ids = read_card_ids(blue_conf) # Should be OT = 2 (TCG)
-    white_card_ids = read_card_ids(white_conf) # Should be OT = 32 (CUSTOM)
+@metrics.timed("call_seconds", function="update_card_labels")
+def update_card_labels(database_paths, red_conf, blue_conf, white_conf, error_log_file, dry_run=False,
+                       incremental=False, validate=True, export_file=None):
+    """
+    Updates the OT field in the databases based on card IDs from .conf files.
+    In incremental mode the last applied state is read from the manifest and only
+    cards whose colour changed are touched; unchanged inputs are a no-op.
+    The lists are first checked against the databases: entries no database knows are
+    written to error_log_file, and placeholder IDs, name/ID mismatches or conflicting
+    duplicates abort the update unless validate is False. A dry run writes no files.
+    With export_file, the databases are left as they are and a new database holding
+    only the pool's cards, already labelled, is written to export_file instead.
+    """
+    conf_files = [red_conf, blue_conf, white_conf]
+    manifest = Manifest() if incremental and not export_file else None
+    if manifest and manifest.inputs_unchanged("cdb", conf_files + database_paths):
+        logging.info("Lists and databases are unchanged since the last run; nothing to do.")
+        return True
 
-    all_listed_cards = red_card_ids | blue_card_ids | white_card_ids  # Combine all IDs
+    # Each list is read once; the IDs drive the relabel and the entries the validation
+    lists = {"red": read_card_entries(red_conf), "blue": read_card_entries(blue_conf),
+             "white": read_card_entries(white_conf)}
+    red_card_ids = {card_id for card_id, _, _ in lists["red"]}     # Should be OT = 8 (ILLEGAL)
+    blue_card_ids = {card_id for card_id, _, _ in lists["blue"]}   # Should be OT = 2 (TCG)
+    white_card_ids = {card_id for card_id, _, _ in lists["white"]} # Should be OT = 32 (CUSTOM)
 
-    if not all_listed_cards:
+    if not (red_card_ids or blue_card_ids or white_card_ids):
         logging.error("No card IDs found. Aborting update.")
-        return
+        return False
 
-    for db_path in database_paths:
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+    # A card listed in several colours is labelled by precedence (red > blue > white), not by list order
+    partition = ColourPartition({"red": red_card_ids, "blue": blue_card_ids, "white": white_card_ids})
+    conflicts_file = os.path.join(os.path.dirname(error_log_file), CONFLICTS_FILE)
+    conflicts = len(partition.conflicts()) if dry_run else partition.write_report(conflicts_file)
+    if conflicts:
+        for line in partition.summary():
+            logging.warning(f"Colour overlap {line}.")
+        where = "" if dry_run else f"; see {conflicts_file}"
+        logging.warning(f"{conflicts} cards are listed in more than one colour{where}.")
 
-            # Step 1: Hide all unlisted cards (OT = 4096)
-            logging.info(f"Hiding all unlisted cards in {db_path} by setting OT = 4096...")
-            cursor.execute(f"""
-                UPDATE datas SET ot = 4096 WHERE id NOT IN ({','.join('?' * len(all_listed_cards))})
-            """, tuple(all_listed_cards))
-            logging.info(f"Updated {cursor.rowcount} unlisted cards to OT = 4096.")
+    def check_lists():
+        report = validate_entries(lists, database_paths)
+        report.log()
+        if not dry_run:
+            report.write_unmatched(error_log_file)
+        if report.unmatched():
+            where = "" if dry_run else f"; see {error_log_file}"
+            logging.warning(f"{len(report.unmatched())} listed cards match no database row{where}.")
+        if validate and not report.ok:
+            logging.error("The lists failed validation; fix them or rerun with --skip-validation.")
+            return False
+        return True
 
-            # Step 2: Update OT for listed cards
-            logging.info(f"Updating OT for Red, Blue, and White cards in {db_path}...")
-
-            if red_card_ids:
-                cursor.executemany("UPDATE datas SET ot = 8 WHERE id = ?", [(card_id,) for card_id in red_card_ids])
-                logging.info(f"Updated {len(red_card_ids)} RED cards to ILLEGAL (8).")
-
-            if blue_card_ids:
-                cursor.executemany("UPDATE datas SET ot = 2 WHERE id = ?", [(card_id,) for card_id in blue_card_ids])
-                logging.info(f"Updated {len(blue_card_ids)} BLUE cards to TCG (2).")
+    colours = partition.colours
+    if export_file:
+        if not check_lists():
+            return False
+        if dry_run:
+            logging.info(f"Dry run: {export_file} was not written.")
+            return True
+        try:
+            build_pool_cdb(database_paths, colours["red"], colours["blue"], colours["white"], export_file)
+        except (sqlite3.Error, OSError) as e:
+            logging.error(f"Could not build {export_file}: {e}")
+            return False
+        return True
 
-            if white_card_ids:
-                cursor.executemany("UPDATE datas SET ot = 32 WHERE id = ?", [(card_id,) for card_id in white_card_ids])
-                logging.info(f"Updated {len(white_card_ids)} WHITE cards to CUSTOM (32).")
+    # The lists are validated while the databases are relabelled; nothing is applied if they fail
+    return relabel_databases(database_paths, colours["red"], colours["blue"], colours["white"], dry_run=dry_run,
+                             manifest=manifest, manifest_inputs=conf_files, check=check_lists)
 
-            conn.commit()
-            logging.info(f"Database update complete for {db_path}!")
+def main():
+    parser = argparse.ArgumentParser(description="Relabel the OT field of the EDOPro databases from the colour lists.")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only relabel cards that changed since the last run (see .dmvr_manifest.json)")
+    parser.add_argument("--skip-validation", action="store_true",
+                        help="relabel even if the lists have placeholder IDs, name/ID mismatches or duplicates")
+    parser.add_argument("--export", metavar="CDB",
+                        help="leave the databases alone and write only the pool's cards, labelled, to a new database")
+    args = parser.parse_args()
 
-        except sqlite3.Error as e:
-            logging.error(f"Database error in {db_path}: {e}")
-        finally:
-            conn.close()
+    # Define file paths
+    database_paths = ["cards.cdb", "cards-unofficial.cdb", "goat-entries.cdb"]  # List of databases to search
+    red_conf = "OnlyRedCards.conf"
+    blue_conf = "OnlyBlueCards.conf"
+    white_conf = "OnlyWhiteCards.conf"
+    error_log_file = "unmatched_cards.txt"  # File to log unmatched card names
 
-# Define file paths
-database_paths = ["cards.cdb", "cards-unofficial.cdb", "goat-entries.cdb"]  # List of databases to search
-red_conf = "OnlyRedCards.conf"
-blue_conf = "OnlyBlueCards.conf"
-white_conf = "OnlyWhiteCards.conf"
-error_log_file = "unmatched_cards.txt"  # File to log unmatched card names
+    # Run the update; a failed validation or relabel exits non-zero for CI and wrapper scripts
+    ok = update_card_labels(database_paths, red_conf, blue_conf, white_conf, error_log_file, dry_run=args.dry_run,
+                            incremental=args.incremental, validate=not args.skip_validation,
+                            export_file=args.export)
+    raise SystemExit(0 if ok else 1)
 
-# Run the update
-update_card_labels(database_paths, red_conf, blue_conf, white_conf, error_log_file)
+if __name__ == "__main__":
+    main()
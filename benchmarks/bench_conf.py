@@ -0,0 +1,47 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr.conf import read_conf, read_ids
+
+def make_conf(path, lines, seed=0):
+    """Write a synthetic .conf list with the usual header lines."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("#[BENCH LIST]\r\n!BENCH LIST\r\n$whitelist\r\n")
+        for i in range(lines):
+            f.write(f"{rng.randrange(1, 999999999)} {rng.randrange(4)} # Synthetic Card {i},\r\n")
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28}{(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "bench.conf")
+        dst = os.path.join(tmp, "bench_out.conf")
+        make_conf(src, lines)
+        print(f"{lines} entries, {os.path.getsize(src) / 1e6:.1f} MB")
+
+        timed("read_ids", lambda: read_ids(src))
+        conf = timed("read_conf", lambda: read_conf(src))
+        # Measured separately: tracemalloc slows parsing down considerably
+        tracemalloc.start()
+        read_conf(src)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{'read_conf peak memory':<28}{peak / 1e6:9.1f} MB")
+        timed("write", lambda: conf.write(dst))
+
+        with open(src, "rb") as a, open(dst, "rb") as b:
+            print("round trip identical:", a.read() == b.read())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import csv
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr.banlist import BANLIST_MAPPING
+
+# Tier banners and drop rates as they appear in the AllCards.csv export
+CSV_TIERS = ["SSSSS", "SSSS", "SSS", "SS", "S", "A", "B", "C", "D"]
+RESTRICTIONS = list(BANLIST_MAPPING)
+NAME_PATTERN = re.compile(r"Synthetic Card (\d+)$")
+
+def card_name(i):
+    return f"Synthetic Card {i}"
+
+def card_id(i):
+    return 10000000 + i * 7
+
+def card_index(name):
+    """Inverse of card_name(), or None for names that are not synthetic."""
+    m = NAME_PATTERN.match(name.strip())
+    return int(m.group(1)) if m else None
+
+def extra_deck_indices(count):
+    """Every tenth card plays the part of an extra deck monster."""
+    return range(0, count, 10)
+
+def generate_all_cards_csv(path, count, seed=0):
+    """AllCards.csv in the tiered layout: a banner and a header row per tier section."""
+    rng = random.Random(seed)
+    per_tier = max(1, count // len(CSV_TIERS))
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["", "", "Current Available Card Pool", ""])
+        i = 0
+        for tier in CSV_TIERS:
+            writer.writerow(["", "", f"Tier {tier} ({rng.randrange(50)}% Drop Rate)", "Notes"])
+            writer.writerow(["Tier", "Card ID", "Card Name", ""])
+            for _ in range(per_tier if tier != CSV_TIERS[-1] else count - i):
+                # A few rows come without an ID and have to be resolved by name
+                row_id = "" if rng.random() < 0.01 else card_id(i)
+                writer.writerow([tier, row_id, card_name(i), ""])
+                i += 1
+
+def generate_banlist(path, count, seed=0):
+    """Banlist.txt TSV: numbered rows of (blank, tier, type, name, restriction)."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\tTier\tCard Type\tName\tRestriction\tRemarks\n")
+        for i in range(count):
+            f.write(f"{i + 3}\n")
+            tier = rng.choice(["Red", "Blue", "White"])
+            f.write(f"\t{tier}\tMonster/Effect\t{card_name(i)}\t{rng.choice(RESTRICTIONS)}\n")
+
+def generate_banlist_extra(path, count, seed=0):
+    """BanlistExtra.txt with Tier B/C/D sections of indented extra deck names."""
+    rng = random.Random(seed)
+    tiers = {"B": [], "C": [], "D": []}
+    for i in extra_deck_indices(count):
+        tiers[rng.choice("BCD")].append(card_name(i))
+    with open(path, "w", encoding="utf-8") as f:
+        for tier, names in tiers.items():
+            f.write(f"\nTier {tier} Cards\n\n")
+            for name in names:
+                f.write(f"    {name}\n")
+
+def generate_extra_deck_names(path, count):
+    """The extracted_extra_deck.txt list read by remove_extra_deck_from_all.py."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{card_name(i)}\n" for i in extra_deck_indices(count))
+
+def generate_card_data(path, count):
+    """cardData.json: a list of {"id", "name"} objects."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{"id": card_id(i), "name": card_name(i)} for i in range(count)], f)
+
+def generate_name_list(path, indices):
+    """An Only*Cards.txt list of card names, one per line."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(f"{card_name(i)}\n" for i in indices)
+
+def generate_conf(path, indices, title="BENCH LIST", seed=0):
+    """A .conf list with the usual header lines for the given card indices."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(f"#[{title}]\n!{title}\n$whitelist\n")
+        for i in indices:
+            f.write(f"{card_id(i)} {rng.randrange(4)} # {card_name(i)},\n")
+
+def generate_cdb(path, count, seed=0):
+    """A cards.cdb with the EDOPro datas/texts schema and `count` cards."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE datas (id INTEGER PRIMARY KEY, ot INTEGER, alias INTEGER, setcode INTEGER,
+        type INTEGER, atk INTEGER, def INTEGER, level INTEGER, race INTEGER, attribute INTEGER, category INTEGER)""")
+    conn.execute("""CREATE TABLE texts (id INTEGER PRIMARY KEY, name TEXT, desc TEXT, str1 TEXT, str2 TEXT,
+        str3 TEXT, str4 TEXT, str5 TEXT, str6 TEXT, str7 TEXT, str8 TEXT, str9 TEXT, str10 TEXT, str11 TEXT,
+        str12 TEXT, str13 TEXT, str14 TEXT, str15 TEXT, str16 TEXT)""")
+    conn.executemany(
+        "INSERT INTO datas VALUES (?, ?, 0, 0, ?, ?, ?, ?, ?, ?, 0)",
+        ((card_id(i), rng.choice((1, 2, 3)), 0x21, rng.randrange(3000), rng.randrange(3000),
+          rng.randrange(1, 13), 1 << rng.randrange(25), 1 << rng.randrange(7)) for i in range(count)),
+    )
+    conn.executemany(
+        "INSERT INTO texts (id, name, desc) VALUES (?, ?, ?)",
+        ((card_id(i), card_name(i), "Synthetic card text. " * 8) for i in range(count)),
+    )
+    conn.commit()
+    conn.close()
+
+def split_colours(count, seed=0):
+    """Deterministically split card indices into red/blue/white lists (about 5/10/85%)."""
+    rng = random.Random(seed)
+    colours = {"red": [], "blue": [], "white": []}
+    for i in range(count):
+        roll = rng.random()
+        colours["red" if roll < 0.05 else "blue" if roll < 0.15 else "white"].append(i)
+    return colours
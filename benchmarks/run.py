@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import generators
+from dmvr import resolver
+from dmvr.allcards import load_all_cards
+from dmvr.banlist import parse_banlist
+from dmvr.fetch import YgoprodeckClient
+from stub_server import StubServer
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+COLOURS = ["red", "blue", "white"]
+
+def load_script(relative_path, module_name):
+    """Import one of the repo's scripts by path (they live in folders that are not packages)."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+extract_yugioh_ids = load_script("ImplementIDsFromCDBfilterFiles/extract_yugioh_ids.py", "extract_yugioh_ids")
+add_banlist_tier = load_script("AddBanlisTierToCards/AddBanlistTierToCards.py", "AddBanlistTierToCards")
+cdb_filter = load_script("CDBfilter/script.py", "cdbfilter_script")
+remove_extra_deck = load_script("scripts/remove_extra_deck_from_all.py", "remove_extra_deck_from_all")
+
+def generate_fixtures(directory, size, api_names):
+    """Write every synthetic input for one size into directory."""
+    colours = generators.split_colours(size)
+    generators.generate_all_cards_csv(os.path.join(directory, "AllCards.csv"), size)
+    generators.generate_banlist(os.path.join(directory, "Banlist.txt"), size)
+    generators.generate_banlist_extra(os.path.join(directory, "BanlistExtra.txt"), size)
+    generators.generate_extra_deck_names(os.path.join(directory, "extracted_extra_deck.txt"), size)
+    generators.generate_card_data(os.path.join(directory, "cardData.json"), size)
+    generators.generate_cdb(os.path.join(directory, "cards.cdb"), size)
+    for colour in COLOURS:
+        title = colour.capitalize()
+        generators.generate_conf(os.path.join(directory, f"Only{title}Cards.conf"), colours[colour],
+                                 title=f"DMVR {colour.upper()} CARD LIST")
+    # Name resolution goes over (fake) HTTP, so only a slice of the names is resolved
+    generators.generate_name_list(os.path.join(directory, "OnlyWhiteCards.txt"), range(min(size, api_names)))
+
+def conf_paths(directory):
+    return [os.path.join(directory, f"Only{colour.capitalize()}Cards.conf") for colour in COLOURS]
+
+def bench_load_all_cards(work):
+    load_all_cards(os.path.join(work, "AllCards.csv"))
+
+def bench_process_cards(work):
+    extract_yugioh_ids.process_cards(os.path.join(work, "OnlyWhiteCards.txt"),
+                                     os.path.join(work, "OnlyWhiteCards.resolved.conf"))
+
+def bench_update_conf_file(work):
+    banlist = parse_banlist(os.path.join(work, "Banlist.txt"))
+    for conf_file in conf_paths(work):
+        add_banlist_tier.update_conf_file(conf_file, banlist)
+
+def bench_update_card_labels(work):
+    red, blue, white = conf_paths(work)
+    cdb_filter.update_card_labels([os.path.join(work, "cards.cdb")], red, blue, white,
+                                  os.path.join(work, "unmatched_cards.txt"))
+
+def bench_filter_file(work):
+    remove_extra_deck.filter_file(os.path.join(work, "extracted_extra_deck.txt"),
+                                  os.path.join(work, "cardData.json"), conf_paths(work))
+
+BENCHMARKS = [
+    ("load_all_cards", bench_load_all_cards),
+    ("process_cards", bench_process_cards),
+    ("update_conf_file", bench_update_conf_file),
+    ("update_card_labels", bench_update_card_labels),
+    ("filter_file", bench_filter_file),
+]
+
+def run_size(size, args, stub, tmp):
+    """Time every benchmark for one size. Each repeat starts from a fresh copy of the fixtures."""
+    fixtures = os.path.join(tmp, f"fixtures-{size}")
+    os.makedirs(fixtures)
+    start = time.perf_counter()
+    generate_fixtures(fixtures, size, args.api_names)
+    print(f"{size} cards: fixtures generated in {time.perf_counter() - start:.1f} s")
+
+    timings = {}
+    for name, bench in BENCHMARKS:
+        if args.only and name not in args.only:
+            continue
+        best = None
+        for _ in range(args.repeat):
+            work = os.path.join(tmp, "work")
+            shutil.rmtree(work, ignore_errors=True)
+            shutil.copytree(fixtures, work)
+            # Cold cache and a fresh client for every run, so every name goes over the wire
+            resolver.use_client(
+                YgoprodeckClient(stub.url, rate=args.rate, workers=args.workers, backoff=0.01),
+                resolver.CardIdCache(":memory:"),
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                bench(work)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = round(best, 4)
+        print(f"  {name:<22}{best * 1000:10.1f} ms")
+    shutil.rmtree(fixtures)
+    return timings
+
+def compare(results, baseline, tolerance):
+    """Print each timing against the baseline; return the (size, stage) pairs that got slower than allowed."""
+    regressions = []
+    print(f"\n{'size':>9}  {'stage':<22}{'baseline':>11}{'now':>11}{'ratio':>8}")
+    for size, timings in results.items():
+        for stage, seconds in timings.items():
+            before = baseline.get(size, {}).get(stage)
+            if before is None:
+                continue
+            ratio = seconds / before if before else float("inf")
+            flag = ""
+            if ratio > 1 + tolerance:
+                regressions.append((size, stage))
+                flag = "  SLOWER"
+            print(f"{size:>9}  {stage:<22}{before * 1000:9.1f}ms{seconds * 1000:9.1f}ms{ratio:7.2f}x{flag}")
+    return regressions
+
+def save_baseline(report, path):
+    """Store this run's timings in the baseline; sizes and stages the run did not measure keep their old timings."""
+    baseline = {"results": {}}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    for size, timings in report["results"].items():
+        baseline["results"].setdefault(size, {}).update(timings)
+    baseline["meta"] = report["meta"]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DMVR scripts on synthetic data.")
+    parser.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")], default=DEFAULT_SIZES,
+                        help="comma-separated card counts (default: 1000,10000,100000; 1000000 works too)")
+    parser.add_argument("--only", nargs="+", choices=[name for name, _ in BENCHMARKS], help="run only these stages")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest is reported")
+    parser.add_argument("--api-names", type=int, default=1000, help="names resolved through the stub server")
+    parser.add_argument("--latency", type=float, default=0.005, help="stub server latency per request (s)")
+    parser.add_argument("--throttle", type=float, default=0.02, help="share of stub requests answered with 429")
+    parser.add_argument("--rate", type=float, default=1000, help="client request rate against the stub")
+    parser.add_argument("--workers", type=int, default=16, help="client worker threads")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results in the baseline (only the sizes and stages that were run)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline before a stage counts as a regression")
+    args = parser.parse_args()
+
+    # The scripts log every database they touch; keep the output to the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    # No Ignis databases: every name the stub knows has to be fetched through it
+    resolver.IGNIS_DB_FILES = []
+
+    results = {}
+    with StubServer(latency=args.latency, throttle_rate=args.throttle) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results[str(size)] = run_size(size, args, stub, tmp)
+        print(f"Stub server: {stub.requests} requests, {stub.throttled} answered with 429")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "api_names": args.api_names,
+            "stub_latency": args.latency,
+            "stub_throttle": args.throttle,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        save_baseline(report, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from generators import card_id, card_index
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers cardinfo.php queries for the synthetic card names from generators.py."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this every keep-alive
+    # request pays the 40 ms Nagle/delayed-ACK stall and the stub measures itself
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        query = parse_qs(urlparse(self.path).query)
+        stub.count_request()
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.throttle_rate and stub.rng.random() < stub.throttle_rate:
+            stub.count_throttled()
+            return self.reply(429, {"error": "Rate limit exceeded"}, {"Retry-After": "0"})
+
+        name = (query.get("name") or query.get("fname") or [""])[0]
+        index = card_index(name)
+        if index is None:
+            return self.reply(400, {"error": "No card matching your query was found in the database."})
+        self.reply(200, {"data": [{"id": card_id(index), "name": name}]})
+
+    def reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+class StubServer:
+    """
+    Local stand-in for YGOPRODeck's cardinfo.php with configurable per-request
+    latency (seconds) and share of requests answered with 429.
+    Use as a context manager; `url` is the endpoint to hand to YgoprodeckClient.
+    """
+
+    def __init__(self, latency=0.0, throttle_rate=0.0, port=0, seed=0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/api/v7/cardinfo.php"
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def count_throttled(self):
+        with self.lock:
+            self.throttled += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake cardinfo.php for the synthetic benchmark cards.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds to wait before each answer")
+    parser.add_argument("--throttle", type=float, default=0.0, help="share of requests answered with 429")
+    args = parser.parse_args()
+
+    stub = StubServer(latency=args.latency, throttle_rate=args.throttle, port=args.port)
+    print(f"Serving {stub.url} (Ctrl+C to stop)")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared helpers used by the DMVR card management scripts."""
@@ -0,0 +1,53 @@
+import csv
+import re
+from collections import namedtuple
+
+from dmvr import metrics
+
+# ",,Tier A (9% Drop Rate),Notes" opens the Tier A section
+BANNER_PATTERN = re.compile(r"Tier (\w+) \(")
+
+# One card row of AllCards.csv; card_id is "" when the sheet has no ID for the card
+CardRow = namedtuple("CardRow", ["tier", "card_id", "name"])
+
+
+def iter_all_cards(filename):
+    """
+    Stream the card rows of the tiered AllCards.csv export as CardRow tuples.
+    The sheet is a stack of sections, each opened by a "Tier X (..% Drop Rate)"
+    banner and usually a "Tier,Card ID,Card Name" header row. Column positions are
+    taken from each header row and kept for sections without one (the Tier A header
+    was overwritten by its first card, which therefore has "Tier" as its tier).
+    Banners, headers and title rows are skipped; only one row is in memory at a time.
+    """
+    tier = None
+    id_column, name_column = 1, 2
+    banner_match = BANNER_PATTERN.match
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            row_tier = row[0].strip()
+            if not row_tier:
+                # Banners and titles leave the tier column empty
+                banner = next((m for m in map(banner_match, row) if m), None)
+                if banner:
+                    tier = banner.group(1)
+                    continue
+            elif row_tier == "Tier" and "Card Name" in row and "Card ID" in row:
+                id_column, name_column = row.index("Card ID"), row.index("Card Name")
+                continue
+
+            width = len(row)
+            card_id = row[id_column].strip() if id_column < width else ""
+            name = row[name_column].strip() if name_column < width else ""
+            # Title rows like ",,Current Available Card Pool," have neither a tier nor an ID
+            if not name or not (row_tier or card_id):
+                continue
+            yield CardRow(tier if row_tier in ("", "Tier") else row_tier, card_id, name)
+
+
+@metrics.timed("call_seconds", function="load_all_cards")
+def load_all_cards(filename):
+    """Every card row of AllCards.csv as a list; prefer iter_all_cards() for large exports."""
+    return list(iter_all_cards(filename))
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from dmvr import metrics
+from dmvr.names import name_key
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is only needed to transcode or resize
+    Image = None
+
+# EDOPro's card pictures are 421x614, looked up as pics/<id>.png or .jpg
+CARD_SIZE = (421, 614)
+OUTPUT_FORMATS = {"png": ("PNG", ".png"), "jpg": ("JPEG", ".jpg")}
+FORMAT_EXTENSIONS = dict(OUTPUT_FORMATS.values())
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+# Content hashes of the pictures written by the last run, kept in the output directory
+STATE_FILE = ".artwork_state.json"
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artwork_key(filename):
+    """The name index key for an artwork file name ("Dark Magician (Anime).jpg" -> "dark magician")."""
+    return name_key(os.path.splitext(filename)[0])
+
+
+def needs_transcode(path, image_format, size):
+    """True unless the file already is a picture of the right format and size."""
+    if Image is None:  # Without Pillow only the file extension can be checked
+        return os.path.splitext(path)[1].lower() != FORMAT_EXTENSIONS[image_format]
+    with Image.open(path) as image:
+        return image.format != image_format or image.size != tuple(size)
+
+
+def convert_artwork(src, dst, action, image_format, size, keep_source):
+    """
+    Write src as dst; runs in a worker process. A "rename" moves (or copies) the file
+    as is, a "convert" re-encodes it in the given format and size.
+    Returns (what was done, content hash of dst).
+    """
+    tmp_path = f"{dst}.tmp"
+    if action == "rename":
+        if not keep_source:
+            os.replace(src, dst)
+            return "renamed", content_hash(dst)
+        shutil.copyfile(src, tmp_path)
+        done = "copied"
+    elif Image is None:
+        raise RuntimeError("Pillow is required to transcode artwork (pip install Pillow)")
+    else:
+        with Image.open(src) as image:
+            done = "converted" if image.format != image_format else "resized"
+            if image.size != tuple(size):
+                image = image.resize(size, Image.LANCZOS)
+            if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(tmp_path, format=image_format)
+    os.replace(tmp_path, dst)
+    if not keep_source and os.path.abspath(src) != os.path.abspath(dst):
+        os.remove(src)
+    return done, content_hash(dst)
+
+
+def plan_artwork(src, dst, recorded, image_format, size, keep_source):
+    """
+    Decide what to do with one source file; runs in a worker process. recorded is
+    the state the last run stored for dst. Returns (src, dst, source hash, action)
+    with action one of "skip", "verified", "rename", "convert" or "error".
+    """
+    try:
+        source_hash = content_hash(src)
+        action = _plan_action(src, dst, source_hash, recorded, image_format, size, keep_source)
+    except OSError as e:
+        print(f"Could not read '{os.path.basename(src)}': {e}")
+        return src, dst, None, "error"
+    return src, dst, source_hash, action
+
+
+def _plan_action(src, dst, source_hash, recorded, image_format, size, keep_source):
+    if os.path.abspath(src) == os.path.abspath(dst):
+        # Already named by ID: only redo it if it is not the file the last run wrote
+        if recorded.get("hash") == source_hash:
+            return "skip"
+    elif keep_source and recorded.get("source_hash") == source_hash and os.path.exists(dst) \
+            and content_hash(dst) == recorded.get("hash"):
+        return "skip"
+    if needs_transcode(src, image_format, size):
+        return "convert"
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return "verified"
+    return "rename"
+
+
+def _plan_task(args):
+    return plan_artwork(*args)
+
+
+def _convert_task(args):
+    return convert_artwork(*args)
+
+
+@metrics.timed("call_seconds", function="process_artwork")
+def process_artwork(directory, name_index, out_dir=None, output_format="png", size=CARD_SIZE, dry_run=False,
+                    workers=None):
+    """
+    Rename and transcode every picture in directory to <card id><ext> in out_dir
+    (default: in place, replacing the source). Names are matched through name_index
+    ({name_key(): id}). Files whose content is unchanged since the last run are
+    skipped. Returns {"converted": n, "renamed": n, "skipped": n, "unmatched": [names], ...}.
+    """
+    image_format, extension = OUTPUT_FORMATS[output_format]
+    out_dir = out_dir or directory
+    keep_source = os.path.abspath(out_dir) != os.path.abspath(directory)
+    state_path = os.path.join(out_dir, STATE_FILE)
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+    summary = {"converted": 0, "resized": 0, "renamed": 0, "copied": 0, "verified": 0, "skipped": 0,
+               "unmatched": [], "failed": []}
+    sources = {}  # destination -> source file
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            if not entry.is_file() or ext.lower() not in IMAGE_EXTENSIONS:
+                continue
+            card_id = name if name.isdigit() else name_index.get(artwork_key(entry.name))
+            if card_id is None:
+                summary["unmatched"].append(entry.name)
+                continue
+            dst = os.path.join(out_dir, f"{card_id}{extension}")
+            previous = sources.get(dst)
+            if previous is not None and os.path.abspath(previous) != os.path.abspath(dst):
+                if os.path.abspath(entry.path) != os.path.abspath(dst):
+                    print(f"'{entry.name}' and '{os.path.basename(previous)}' are both card {card_id}; "
+                          f"skipping '{entry.name}'.")
+                continue
+            # A newly added picture replaces the one already named after the card
+            sources[dst] = entry.path
+    tasks = [(src, dst, state.get(os.path.basename(dst), {}), image_format, size, keep_source)
+             for dst, src in sources.items()]
+
+    if not dry_run:
+        os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        plans = list(pool.map(_plan_task, tasks, chunksize=32))
+        work = []
+        for src, dst, source_hash, action in plans:
+            if action == "error":
+                summary["failed"].append(os.path.basename(src))
+            elif action in ("skip", "verified"):
+                summary["skipped" if action == "skip" else "verified"] += 1
+                if action == "verified":
+                    state[os.path.basename(dst)] = {"source_hash": source_hash, "hash": source_hash}
+            elif dry_run:
+                verb = "convert" if action == "convert" else ("copy" if keep_source else "rename")
+                print(f"Would {verb} '{os.path.basename(src)}' to '{os.path.basename(dst)}'")
+            else:
+                work.append((src, dst, source_hash, action))
+
+        futures = [
+            (src, dst, source_hash, pool.submit(_convert_task, (src, dst, action, image_format, size, keep_source)))
+            for src, dst, source_hash, action in work
+        ]
+        for src, dst, source_hash, future in futures:
+            try:
+                action, output_hash = future.result()
+            except (OSError, RuntimeError) as e:
+                print(f"Could not convert '{os.path.basename(src)}': {e}")
+                summary["failed"].append(os.path.basename(src))
+                continue
+            summary[action] += 1
+            state[os.path.basename(dst)] = {"source_hash": source_hash, "hash": output_hash}
+
+    if not dry_run:
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=0, sort_keys=True)
+        os.replace(tmp_path, state_path)
+    return summary
@@ -0,0 +1,43 @@
+# Mapping restriction levels to numbers
+BANLIST_MAPPING = {
+    "Forbidden": "0",
+    "Limited": "1",
+    "Semi-Limited": "2",
+    "Unlimited": "3"
+}
+
+# Extra deck tiers in BanlistExtra.txt and the colour list each one goes into
+EXTRA_TIER_COLOURS = {"B": "blue", "C": "red", "D": "white"}
+
+
+def parse_banlist(banlist_file):
+    """Extracts card names and their restriction levels from the banlist file."""
+    banlist = {}
+    with open(banlist_file, "r", encoding="utf-8") as file:
+        for line in file:
+            parts = line.strip().split("\t")  # Assuming tab-separated values
+            if len(parts) >= 4:
+                card_name = parts[2].strip()
+                restriction = BANLIST_MAPPING.get(parts[3].strip(), "3")
+                banlist[card_name] = restriction
+    return banlist
+
+
+def parse_extra_banlist(file_path):
+    """Parses the extra deck banlist and categorizes cards into tiers B, C, and D."""
+    banlist = {"B": [], "C": [], "D": []}
+    current_tier = None
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            if "Tier B Cards" in line:
+                current_tier = "B"
+            elif "Tier C Cards" in line:
+                current_tier = "C"
+            elif "Tier D Cards" in line:
+                current_tier = "D"
+            elif current_tier and line:
+                banlist[current_tier].append(line)
+    return banlist
@@ -0,0 +1,269 @@
+import json
+import marshal
+import os
+import re
+from operator import itemgetter
+
+from dmvr import metrics
+from dmvr.names import clean_card_name, name_key
+
+# Fusion, Synchro, Xyz and Link monsters, by frameType (cardinfo.php) or by the words of their type
+EXTRA_DECK_FRAMES = {"fusion", "synchro", "xyz", "link", "fusion_pendulum", "synchro_pendulum", "xyz_pendulum"}
+EXTRA_DECK_TYPE_PATTERN = re.compile(r"Fusion|Synchro|XYZ|Link")
+TYPE_FIELDS = frozenset(("type", "frameType"))
+TYPE_KEYS = ('"type"', '"frameType"')
+
+GET_ID = itemgetter("id")
+GET_NAME = itemgetter("name")
+
+# Compact index of a dump, written next to it
+INDEX_SUFFIX = ".index"
+INDEX_VERSION = 4
+
+CHUNK_SIZE = 1 << 20
+# Dumps up to this size are decoded in one go; streaming only pays off for larger ones
+WHOLE_DUMP_SIZE = 16 << 20
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+
+
+class _JsonStream:
+    """Just enough of a pull parser to walk the elements of a large JSON array chunk by chunk."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.batching = True
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """The next non-whitespace character, or "" at the end of the file."""
+        if self.pos < len(self.buffer) and self.buffer[self.pos] not in " \t\n\r":
+            return self.buffer[self.pos]  # Dumps are usually compact, without whitespace between tokens
+        while True:
+            self.pos = WHITESPACE_PATTERN.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more of the file while it is cut short."""
+        self.peek()
+        return self._decode()
+
+    def _decode(self):
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _batch(self):
+        """
+        Decode every complete element between here and the last "}," of the buffer in one go,
+        which is far cheaper than one raw_decode() per small record. Wrapped in brackets, that
+        text is only valid JSON if the cut falls between two elements: a cut inside a string
+        leaves it unterminated and one inside a nested value leaves the element open.
+        Records with nested objects (cardinfo.php) rarely cut cleanly, so the first miss turns
+        batching off for the rest of the document.
+        """
+        cut = self.buffer.rfind("},", self.pos)
+        if cut < 0:
+            return None  # Only the start of an element is left; decode it on its own
+        try:
+            batch = self.decoder.decode("[" + self.buffer[self.pos:cut + 1] + "]")
+        except json.JSONDecodeError:
+            self.batching = False
+            return None
+        self.pos = cut + 2
+        return batch
+
+    def batches(self):
+        """The elements of the array, as lists of consecutive elements (a single one when batching is off)."""
+        self.take("[")
+        while self.peek() != "]":
+            batch = self._batch() if self.batching else None
+            if batch:
+                yield batch
+                continue
+            yield [self._decode()]
+            if self.peek() == ",":
+                self.pos += 1
+        self.take("]")
+
+
+def _iter_card_batches(dump_file):
+    """
+    Stream the card records of a dump as (cards, may_be_typed) lists, at most a chunk's worth decoded
+    at a time; a dump of up to WHOLE_DUMP_SIZE bytes is a single list. may_be_typed is False when the
+    text shows the records have no type fields, so they need not be checked one by one. Accepts
+    both the YGOPRODeck cardinfo.php response ({"data": [...]}) and the plain list of scripts/cardData.json.
+    """
+    with open(dump_file, "r", encoding="utf-8") as f:
+        if os.fstat(f.fileno()).st_size <= WHOLE_DUMP_SIZE:
+            text = f.read()
+            data = json.loads(text)
+            yield (data.get("data", []) if isinstance(data, dict) else data), any(map(text.__contains__, TYPE_KEYS))
+            return
+        stream = _JsonStream(f)
+        if stream.peek() != "{":
+            yield from ((cards, True) for cards in stream.batches())
+            return
+        stream.take("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.take(":")
+            if key == "data":
+                yield from ((cards, True) for cards in stream.batches())
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.take(",")
+
+
+def is_extra_deck(card):
+    """True for Fusion, Synchro, Xyz and Link monsters; dumps without type fields have none."""
+    frame = card.get("frameType")
+    if frame:
+        return frame in EXTRA_DECK_FRAMES
+    card_type = card.get("type")
+    return bool(card_type and EXTRA_DECK_TYPE_PATTERN.search(card_type))
+
+
+class CardIndex:
+    """
+    The IDs and names of the cards in a dump, in dump order, and the IDs of its Extra Deck monsters.
+    ids are kept as the dump has them (ints in YGOPRODeck dumps); extra_deck holds them as strings.
+    typed is False for dumps without type/frameType fields (e.g. scripts/cardData.json), whose
+    extra_deck is empty because the types are unknown, not because there are no such monsters.
+    """
+
+    def __init__(self, ids, names, extra_deck, typed=False):
+        self.ids = ids
+        self.names = names
+        self.extra_deck = extra_deck
+        self.typed = typed
+
+    def __len__(self):
+        return len(self.ids)
+
+    def by_name(self):
+        """{name: ID}; for a name listed twice the later card wins."""
+        return dict(zip(self.names, self.ids))
+
+
+def dump_signature(dump_file):
+    """Size and modification time of a dump; its sidecar is valid while both are unchanged."""
+    stat = os.stat(dump_file)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def read_index(index_file, signature):
+    """The CardIndex stored for the dump with this signature, or None if the sidecar is missing or stale."""
+    try:
+        with open(index_file, "rb") as f:
+            data = marshal.loads(f.read())
+        if data.get("version") != INDEX_VERSION or data.get("source") != signature:
+            return None
+        return CardIndex(data["ids"], data["names"], set(data["extra_deck"]), data["typed"])
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def write_index(index_file, signature, index):
+    """
+    Write the sidecar with marshal: for flat lists of ints and strings it is several times
+    faster than JSON both ways, so writing it barely adds to the first load.
+    """
+    tmp_file = f"{index_file}.tmp"
+    data = {"version": INDEX_VERSION, "source": signature, "ids": index.ids, "names": index.names,
+            "extra_deck": sorted(index.extra_deck), "typed": index.typed}
+    with open(tmp_file, "wb") as f:
+        f.write(marshal.dumps(data))
+    os.replace(tmp_file, index_file)
+
+
+@metrics.timed("call_seconds", function="load_card_index")
+def load_card_index(dump_file, cache=True):
+    """
+    The CardIndex of a dump. The dump is streamed and only IDs, names and types are
+    kept; with cache, the index is also stored in a compact <dump>.index sidecar
+    keyed by the dump's size and mtime, so neither a hit nor a miss reads the dump twice.
+    A directory that cannot be written to just means no cache.
+    """
+    signature = dump_signature(dump_file) if cache else None
+    index_file = dump_file + INDEX_SUFFIX
+    if signature:
+        index = read_index(index_file, signature)
+        if index is not None:
+            metrics.count("card_index_requests_total", result="hit")
+            return index
+        metrics.count("card_index_requests_total", result="miss")
+
+    index = CardIndex([], [], set())
+    # Each batch is taken apart with map(), so the usual record costs no Python-level loop step
+    for cards, may_be_typed in _iter_card_batches(dump_file):
+        try:
+            batch_ids = list(map(GET_ID, cards))
+            batch_names = list(map(GET_NAME, cards))
+            complete = None not in batch_ids and all(batch_names)
+        except KeyError:
+            complete = False
+        if not complete:
+            cards = [card for card in cards if card.get("name") and card.get("id") is not None]
+            batch_ids = list(map(GET_ID, cards))
+            batch_names = list(map(GET_NAME, cards))
+        index.ids.extend(batch_ids)
+        index.names.extend(batch_names)
+        # Dumps without types (scripts/cardData.json) skip the type check altogether
+        if may_be_typed and not all(map(TYPE_FIELDS.isdisjoint, cards)):
+            index.typed = True
+            index.extra_deck.update(str(card_id) for card_id, card in zip(batch_ids, cards) if is_extra_deck(card))
+    if signature:
+        try:
+            write_index(index_file, signature, index)
+        except OSError:
+            pass
+    return index
+
+
+def build_name_index(index):
+    """
+    Build a name -> ID dict keyed by name_key() from a CardIndex.
+    When an alternate print (e.g. "(Anime)") collides with the real card,
+    the real card's ID wins, matching what the exact API search returns.
+    """
+    name_index = {}
+    for card_id, name in zip(index.ids, index.names):
+        key = name_key(name)
+        if key not in name_index or name == clean_card_name(name):
+            name_index[key] = str(card_id)
+    return name_index
+
+
+def load_name_index(dump_file, cache=True):
+    """Load a card dump and return its name -> ID index."""
+    return build_name_index(load_card_index(dump_file, cache=cache))
@@ -0,0 +1,55 @@
+import logging
+import os
+import sqlite3
+
+from dmvr import metrics
+from dmvr.names import name_key
+
+
+class CdbNameIndex:
+    """
+    In-memory name -> ID index over one or more EDOPro card databases.
+    Each database is opened once and its texts table is read in a single scan.
+    Databases are given in precedence order: when two databases know the same
+    name, the earlier one wins (cards.cdb before cards-unofficial.cdb).
+    """
+
+    def __init__(self, db_files):
+        self.db_files = [db_file for db_file in db_files if os.path.exists(db_file)]
+        self.by_name = {}
+        self.by_key = {}
+        self.by_id = {}
+        for db_file in self.db_files:
+            self._load(db_file)
+
+    def _load(self, db_file):
+        conn = sqlite3.connect(db_file)
+        try:
+            with metrics.timer("cdb_read_seconds", database=os.path.basename(db_file)):
+                rows = conn.execute("SELECT id, name FROM texts").fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Could not read names from {db_file}: {e}")
+            return
+        finally:
+            conn.close()
+        for card_id, name in rows:
+            if not name:
+                continue
+            card_id = str(card_id)
+            self.by_name.setdefault(name, card_id)
+            self.by_key.setdefault(name_key(name), card_id)
+            self.by_id.setdefault(card_id, name)
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def get_id(self, name):
+        """Return the ID for a card name (exact match first, then by name_key()), or None."""
+        card_id = self.by_name.get(name)
+        if card_id is None:
+            card_id = self.by_key.get(name_key(name))
+        return card_id
+
+    def get_name(self, card_id):
+        """Return the name stored for an ID, or None."""
+        return self.by_id.get(str(card_id))
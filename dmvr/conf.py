@@ -0,0 +1,192 @@
+import os
+import re
+from array import array
+
+ENTRY_PATTERN = re.compile(r"(\d+) (\d) # (.+),")
+ENTRY_LINES_PATTERN = re.compile(r"^(\d+) (\d) # (.+),", re.MULTILINE)
+
+
+class ConfEntry:
+    """One "<id> <restriction> # <name>," line."""
+
+    __slots__ = ("card_id", "restriction", "name")
+
+    def __init__(self, card_id, restriction, name):
+        self.card_id = card_id
+        self.restriction = restriction
+        self.name = name
+
+    def __repr__(self):
+        return f"ConfEntry({self.card_id!r}, {self.restriction}, {self.name!r})"
+
+
+def iter_entries(path):
+    """Stream (card_id, restriction, name) tuples from a .conf file without keeping it in memory."""
+    match = ENTRY_PATTERN.match
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for line in f:
+            m = match(line)
+            if m:
+                yield m.group(1), int(m.group(2)), m.group(3)
+
+
+def read_entries(path):
+    """
+    Return every (card_id, restriction, name) of a .conf file as strings, in file order.
+    Faster than iter_entries() when the whole file is needed anyway.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return ENTRY_LINES_PATTERN.findall(f.read())
+
+
+def read_ids(path):
+    """Return the set of card IDs listed in a .conf file."""
+    match = ENTRY_PATTERN.match
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {m.group(1) for m in map(match, f) if m}
+
+
+def remove_ids(src_path, dst_path, card_ids):
+    """
+    Stream src_path to dst_path, dropping every entry whose ID is in card_ids.
+    IDs are compared exactly (as integers), never as substrings. Returns the number of entries removed.
+    """
+    card_ids = {int(card_id) for card_id in card_ids}
+    match = ENTRY_PATTERN.match
+    removed = 0
+    tmp_path = f"{dst_path}.tmp"
+    with open(src_path, "r", encoding="utf-8", newline="") as src, \
+            open(tmp_path, "w", encoding="utf-8", newline="") as dst:
+        for line in src:
+            m = match(line)
+            if m and int(m.group(1)) in card_ids:
+                removed += 1
+                continue
+            dst.write(line)
+    os.replace(tmp_path, dst_path)
+    return removed
+
+
+class ConfList:
+    """
+    An in-memory EDOPro .conf file in columnar form.
+    ids/restrictions/names/tails hold one slot per "<id> <restriction> # <name>,"
+    entry; every other line (#[Title], !Title, $whitelist, blanks) is kept verbatim
+    in `other` with its position, so a file is written back byte for byte.
+    """
+
+    __slots__ = ("ids", "restrictions", "names", "tails", "other", "id_texts")
+
+    def __init__(self):
+        self.ids = array("I")
+        self.restrictions = bytearray()
+        self.names = []
+        self.tails = []       # whatever followed the trailing comma, usually the line ending
+        self.other = []       # (number of entries before the line, raw line)
+        self.id_texts = {}    # slot -> ID text, for IDs that do not round-trip through int (e.g. "00000000")
+
+    @classmethod
+    def parse(cls, lines):
+        conf = cls()
+        match = ENTRY_PATTERN.match
+        add_id, add_restriction = conf.ids.append, conf.restrictions.append
+        add_name, add_tail, add_other = conf.names.append, conf.tails.append, conf.other.append
+        id_texts = conf.id_texts
+        slot = 0
+        for line in lines:
+            m = match(line)
+            if m is None:
+                add_other((slot, line))
+                continue
+            card_id, restriction, name = m.groups()
+            value = int(card_id)
+            if card_id[0] == "0":
+                id_texts[slot] = card_id
+            add_id(value)
+            add_restriction(ord(restriction) - 48)
+            add_name(name)
+            add_tail(line[m.end():])
+            slot += 1
+        return conf
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        for slot in range(len(self.names)):
+            yield self.entry(slot)
+
+    def card_id(self, slot):
+        return self.id_texts.get(slot) or str(self.ids[slot])
+
+    def entry(self, slot):
+        return ConfEntry(self.card_id(slot), self.restrictions[slot], self.names[slot])
+
+    def append(self, card_id, restriction, name, tail="\n"):
+        card_id = str(card_id)
+        slot = len(self.names)
+        self._terminate_last_line()
+        value = int(card_id)
+        self.ids.append(value)
+        if str(value) != card_id:
+            self.id_texts[slot] = card_id
+        self.restrictions.append(int(restriction))
+        self.names.append(name)
+        self.tails.append(tail)
+
+    def _terminate_last_line(self):
+        """Make sure the current last line ends with a newline before something is appended after it."""
+        if self.other and self.other[-1][0] == len(self.names):
+            position, line = self.other[-1]
+            if line and not line.endswith("\n"):
+                self.other[-1] = (position, line + "\n")
+        elif self.tails and not self.tails[-1].endswith("\n"):
+            self.tails[-1] += "\n"
+
+    def id_set(self):
+        """Set of the listed IDs as strings."""
+        return {self.card_id(slot) for slot in range(len(self.names))}
+
+    def filter(self, keep):
+        """Return a new ConfList with only the entries for which keep(entry) is true; other lines are kept."""
+        result = ConfList()
+        other = iter(self.other)
+        pending = next(other, None)
+        for slot in range(len(self.names)):
+            while pending is not None and pending[0] <= slot:
+                result.other.append((len(result), pending[1]))
+                pending = next(other, None)
+            entry = self.entry(slot)
+            if keep(entry):
+                result.append(entry.card_id, entry.restriction, entry.name, self.tails[slot])
+        while pending is not None:
+            result.other.append((len(result), pending[1]))
+            pending = next(other, None)
+        return result
+
+    def lines(self):
+        """Yield the file's lines in order, exactly as they will be written."""
+        other = self.other
+        next_other = 0
+        ids, restrictions, names, tails, id_texts = self.ids, self.restrictions, self.names, self.tails, self.id_texts
+        for slot in range(len(names)):
+            while next_other < len(other) and other[next_other][0] <= slot:
+                yield other[next_other][1]
+                next_other += 1
+            card_id = id_texts.get(slot) or ids[slot]
+            yield f"{card_id} {restrictions[slot]} # {names[slot]},{tails[slot]}"
+        for _, line in other[next_other:]:
+            yield line
+
+    def write(self, path):
+        """Write the file atomically (temporary file + rename)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(self.lines())
+        os.replace(tmp_path, path)
+
+
+def read_conf(path):
+    """Parse a whole .conf file into a ConfList."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return ConfList.parse(f)
@@ -0,0 +1,263 @@
+"""
+Check EDOPro .ydk decks against the merged card pool:
+
+    python -m dmvr.decks decks/ more/deck.ydk [--max red=1 --max blue=5] [--report deck_report.txt]
+        [--red OnlyRedCards.conf ...] [--banlist-extra BanlistExtra.txt] [--card-data cardData.json]
+        [--snapshot build/pool.snap] [--workers N]
+
+Every deck is checked for cards outside the pool, copies over the restriction
+in the colour lists (0 Forbidden, 1 Limited, 2 Semi-Limited), colour limits,
+Extra Deck monsters in the Main Deck and the deck sizes. A report with every
+violation of every deck and a summary is written; the exit status is 1 if any
+deck is illegal.
+"""
+import argparse
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from dmvr import metrics
+from dmvr.partition import COLOURS, DEFAULT_PRECEDENCE
+from dmvr.snapshot import PoolCard, PoolSnapshot, pool_from_confs
+
+DECK_SECTIONS = ("main", "extra", "side")
+MAIN_DECK_SIZE = (40, 60)
+EXTRA_DECK_MAX = 15
+SIDE_DECK_MAX = 15
+REPORT_FILE = "deck_report.txt"
+
+# Smaller batches are checked in-process; starting workers costs more than they would save
+PARALLEL_MIN_DECKS = 500
+
+
+class DeckIndex:
+    """
+    {card ID: PoolCard} over the merged pool, built once and shared by every check.
+    extra_deck_ids (CardIndex.extra_deck of a dump with card types) flags Extra Deck
+    monsters on top of the cards' own flags; with it the types are known for every
+    card, and cards in the Extra Deck that are not Extra Deck monsters are reported too.
+    """
+
+    def __init__(self, cards, extra_deck_ids=None):
+        self.cards = {}
+        for card_id, colour, restriction, extra_deck, name in cards:
+            card_id = int(card_id)
+            if card_id in self.cards:
+                continue
+            extra_deck = bool(extra_deck) or (extra_deck_ids is not None and str(card_id) in extra_deck_ids)
+            self.cards[card_id] = PoolCard(card_id, colour, int(restriction), extra_deck, name)
+        self.types_known = extra_deck_ids is not None
+
+    def __len__(self):
+        return len(self.cards)
+
+
+class DeckRules:
+    """Deck size limits and the most cards of each colour a deck may hold (colours without a limit are free)."""
+
+    def __init__(self, colour_limits=None, main_size=MAIN_DECK_SIZE, extra_max=EXTRA_DECK_MAX,
+                 side_max=SIDE_DECK_MAX):
+        self.colour_limits = dict(colour_limits or {})
+        self.main_size = main_size
+        self.extra_max = extra_max
+        self.side_max = side_max
+
+
+class DeckReport:
+    """The result of one deck: section sizes, copies per colour and (kind, message) violations."""
+
+    def __init__(self, path, sizes, colours, violations):
+        self.path = path
+        self.sizes = sizes
+        self.colours = colours
+        self.violations = violations
+
+    @property
+    def ok(self):
+        return not self.violations
+
+
+def read_ydk(path):
+    """{"main": [ids], "extra": [ids], "side": [ids]} of a .ydk file; comments and other lines are skipped."""
+    sections = {section: [] for section in DECK_SECTIONS}
+    current = sections["main"]
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.isdigit():
+                current.append(int(line))
+            elif line[:1] in ("#", "!") and line[1:] in sections:
+                current = sections[line[1:]]
+    return sections
+
+
+def check_deck(path, index, rules):
+    """Check one .ydk file; every card is one dict lookup in the index."""
+    try:
+        deck = read_ydk(path)
+    except OSError as e:
+        return DeckReport(path, {}, {}, [("unreadable", str(e))])
+
+    sizes = {section: len(ids) for section, ids in deck.items()}
+    violations = []
+    low, high = rules.main_size
+    if not low <= sizes["main"] <= high:
+        violations.append(("size", f"Main Deck has {sizes['main']} cards ({low}-{high} allowed)"))
+    if sizes["extra"] > rules.extra_max:
+        violations.append(("size", f"Extra Deck has {sizes['extra']} cards (at most {rules.extra_max})"))
+    if sizes["side"] > rules.side_max:
+        violations.append(("size", f"Side Deck has {sizes['side']} cards (at most {rules.side_max})"))
+
+    cards = index.cards
+    copies = Counter(deck["main"])
+    copies.update(deck["extra"])
+    copies.update(deck["side"])
+    colours = dict.fromkeys(COLOURS, 0)
+    for card_id, count in copies.items():
+        card = cards.get(card_id)
+        if card is None:
+            violations.append(("pool", f"{card_id} is not in the card pool"))
+            continue
+        colours[card.colour] += count
+        if count > card.restriction:
+            if card.restriction == 0:
+                violations.append(("forbidden", f"{card.name} ({card_id}) is Forbidden"))
+            else:
+                violations.append(("copies", f"{count} copies of {card.name} ({card_id}), "
+                                             f"at most {card.restriction} allowed"))
+
+    for card_id in set(deck["main"]):
+        card = cards.get(card_id)
+        if card is not None and card.extra_deck:
+            violations.append(("extra_deck", f"{card.name} ({card_id}) is an Extra Deck monster in the Main Deck"))
+    if index.types_known:
+        for card_id in set(deck["extra"]):
+            card = cards.get(card_id)
+            if card is not None and not card.extra_deck:
+                violations.append(("extra_deck", f"{card.name} ({card_id}) is not an Extra Deck monster"))
+
+    for colour, limit in rules.colour_limits.items():
+        if colours.get(colour, 0) > limit:
+            violations.append(("colour", f"{colours[colour]} {colour} cards (at most {limit})"))
+    return DeckReport(path, sizes, colours, violations)
+
+
+# Set once per worker process by the pool initializer, so the index is not pickled with every deck
+_worker_state = None
+
+
+def _init_worker(index, rules):
+    global _worker_state
+    _worker_state = (index, rules)
+
+
+def _check_task(path):
+    return check_deck(path, *_worker_state)
+
+
+@metrics.timed("call_seconds", function="check_decks")
+def check_decks(paths, index, rules, workers=None):
+    """
+    Check every deck and return their DeckReports in order. Large batches are
+    spread over a process pool; each worker receives the index once.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < PARALLEL_MIN_DECKS:
+        reports = [check_deck(path, index, rules) for path in paths]
+    else:
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index, rules)) as pool:
+            reports = list(pool.map(_check_task, paths, chunksize=chunksize))
+    metrics.count("decks_checked_total", len(reports))
+    return reports
+
+
+def find_decks(paths):
+    """The .ydk files among paths, with directories searched recursively."""
+    decks = []
+    for path in paths:
+        if not os.path.isdir(path):
+            decks.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            decks.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(".ydk"))
+    return decks
+
+
+def summarize(reports):
+    """Deck counts and, per violation kind, how many decks have at least one."""
+    kinds = Counter()
+    for report in reports:
+        kinds.update({kind for kind, _ in report.violations})
+    legal = sum(report.ok for report in reports)
+    return {"decks": len(reports), "legal": legal, "illegal": len(reports) - legal, "violations": dict(kinds)}
+
+
+def write_report(reports, path=REPORT_FILE):
+    """Write every deck's verdict and violations, then the summary. Returns the summary."""
+    summary = summarize(reports)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for report in reports:
+            colours = ", ".join(f"{count} {colour}" for colour, count in report.colours.items() if count)
+            f.write(f"{report.path}: {'legal' if report.ok else 'ILLEGAL'} ({colours or 'no pool cards'})\n")
+            for _, message in report.violations:
+                f.write(f"  - {message}\n")
+        f.write(f"\n{summary['decks']} decks: {summary['legal']} legal, {summary['illegal']} illegal.\n")
+        for kind, count in sorted(summary["violations"].items()):
+            f.write(f"{kind}: {count} decks\n")
+    os.replace(tmp_path, path)
+    return summary
+
+
+def parse_limit(value):
+    """Parse "red=1" into ("red", 1)."""
+    colour, _, limit = value.partition("=")
+    if colour not in COLOURS or not limit.isdigit():
+        raise argparse.ArgumentTypeError(f"expected COLOUR=N with a colour of {', '.join(COLOURS)}")
+    return colour, int(limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check EDOPro .ydk decks against the DMVR card pool.")
+    parser.add_argument("decks", nargs="+", help=".ydk files or folders of them")
+    for colour in DEFAULT_PRECEDENCE:
+        parser.add_argument(f"--{colour}", default=f"Only{colour.capitalize()}Cards.conf")
+    parser.add_argument("--banlist-extra", help="BanlistExtra.txt, to flag extra deck monsters")
+    parser.add_argument("--card-data", help="full card dump (cardData.json or cardinfo.php), for every card's type")
+    parser.add_argument("--snapshot", help="read the pool from a pool.snap instead of the .conf lists")
+    parser.add_argument("--max", type=parse_limit, action="append", default=[], metavar="COLOUR=N",
+                        help="most cards of a colour a deck may hold, e.g. --max red=1 (repeatable)")
+    parser.add_argument("--report", default=REPORT_FILE, help=f"report file (default: {REPORT_FILE})")
+    parser.add_argument("--workers", type=int, help="worker processes for large batches (default: one per CPU)")
+    args = parser.parse_args()
+
+    extra_deck_ids = None
+    if args.card_data:
+        from dmvr.carddump import load_card_index
+
+        card_index = load_card_index(args.card_data)
+        if card_index.typed:
+            extra_deck_ids = card_index.extra_deck
+        else:
+            print(f"{args.card_data} has no card types; only --banlist-extra flags Extra Deck monsters.")
+    if args.snapshot:
+        with PoolSnapshot(args.snapshot) as snapshot:
+            index = DeckIndex(snapshot, extra_deck_ids)
+    else:
+        conf_files = {colour: getattr(args, colour) for colour in DEFAULT_PRECEDENCE
+                      if os.path.exists(getattr(args, colour))}
+        index = DeckIndex(pool_from_confs(conf_files, args.banlist_extra), extra_deck_ids)
+
+    decks = find_decks(args.decks)
+    reports = check_decks(decks, index, DeckRules(dict(args.max)), workers=args.workers)
+    summary = write_report(reports, args.report)
+    print(f"{summary['decks']} decks checked against {len(index)} cards: {summary['legal']} legal, "
+          f"{summary['illegal']} illegal; see {args.report}.")
+    raise SystemExit(1 if summary["illegal"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import hashlib
+import logging
+import os
+
+from dmvr.manifest import file_hash
+from dmvr.names import name_key
+from dmvr.partition import COLOURS
+from dmvr.snapshot import pool_from_confs
+
+
+class ListVariant:
+    """
+    One EDOPro banlist file generated from the pool: the cards of the given colours
+    (optionally without extra deck monsters) under a #[title]/!title header.
+    Whitelist variants add "$whitelist" so that every unlisted card is forbidden.
+    """
+
+    def __init__(self, filename, title, colours=COLOURS, extra_deck=True, whitelist=True, footer=()):
+        self.filename = filename
+        self.title = title
+        self.colours = frozenset(colours)
+        self.extra_deck = extra_deck
+        self.whitelist = whitelist
+        self.footer = tuple(footer)
+
+    def header(self):
+        lines = [f"#[{self.title}]", f"!{self.title}"] + (["$whitelist"] if self.whitelist else [])
+        return "".join(f"{line}\n" for line in lines)
+
+    def accepts(self, colour, extra_deck):
+        return colour in self.colours and (self.extra_deck or not extra_deck)
+
+
+DEFAULT_VARIANTS = [
+    ListVariant("DMVRDA BAN LIST ALL TOURNAMENTS.conf", "DMVRDA BAN LIST ALL TOURNAMENTS", whitelist=False,
+                footer=("$Forbidden",)),
+    ListVariant("OnlyRedCards.conf", "DMVR RED CARD LIST", ["red"]),
+    ListVariant("OnlyBlueCards.conf", "DMVR BLUE CARD LIST", ["blue"]),
+    ListVariant("OnlyWhiteCards.conf", "DMVR WHITE CARD LIST", ["white"]),
+    ListVariant("OnlyRedCards_filtered.conf", "DMVR RED CARD LIST NO EXTRA DECK", ["red"], extra_deck=False),
+    ListVariant("OnlyBlueCards_filtered.conf", "DMVR BLUE CARD LIST NO EXTRA DECK", ["blue"], extra_deck=False),
+    ListVariant("OnlyWhiteCards_filtered.conf", "DMVR WHITE CARD LIST NO EXTRA DECK", ["white"], extra_deck=False),
+]
+
+
+class _VariantWriter:
+    """Streams one variant to a temporary file while hashing it."""
+
+    def __init__(self, variant, out_dir):
+        self.variant = variant
+        self.path = os.path.join(out_dir, variant.filename)
+        self.tmp_path = f"{self.path}.tmp"
+        self.file = open(self.tmp_path, "wb")
+        self.digest = hashlib.sha256()
+        self.count = 0
+        self.write(variant.header().encode("utf-8"))
+
+    def write(self, data):
+        self.file.write(data)
+        self.digest.update(data)
+
+    def finish(self):
+        """Move the file into place unless the existing one is byte-identical. Returns (digest, written)."""
+        self.write("".join(f"{line}\n" for line in self.variant.footer).encode("utf-8"))
+        self.file.close()
+        digest = self.digest.hexdigest()
+        if file_hash(self.path) == digest:
+            os.remove(self.tmp_path)
+            return digest, False
+        os.replace(self.tmp_path, self.path)
+        return digest, True
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.tmp_path)
+
+
+def export_variants(cards, out_dir, variants=DEFAULT_VARIANTS):
+    """
+    Write every list variant from one pass over the pool.
+    cards yields (card_id, colour, restriction, extra_deck, name); they are sorted by
+    name_key(name) (then ID) once, and each line is formatted once and sent to every variant
+    that takes the card. Returns {path: content hash}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    ordered = sorted(cards, key=lambda card: (name_key(card[4]), int(card[0])))
+    writers = []
+    try:
+        for variant in variants:
+            writers.append(_VariantWriter(variant, out_dir))
+        for card_id, colour, restriction, extra_deck, name in ordered:
+            line = f"{card_id} {restriction} # {name},\n".encode("utf-8")
+            for writer in writers:
+                if writer.variant.accepts(colour, extra_deck):
+                    writer.write(line)
+                    writer.count += 1
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+
+    written = {}
+    for writer in writers:
+        digest, changed = writer.finish()
+        if changed:
+            logging.info(f"Wrote {writer.count} cards to {writer.path}.")
+        written[writer.path] = digest
+    return written
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Write every DMVR banlist variant from the colour lists.")
+    for colour in COLOURS:
+        parser.add_argument(f"--{colour}", default=f"Only{colour.capitalize()}Cards.conf")
+    parser.add_argument("--banlist-extra", default="BanlistExtra.txt",
+                        help="BanlistExtra.txt, to recognise extra deck monsters (default: BanlistExtra.txt)")
+    parser.add_argument("--out", default="banlists", help="output directory (default: banlists/)")
+    args = parser.parse_args()
+
+    conf_files = {colour: getattr(args, colour) for colour in COLOURS if os.path.exists(getattr(args, colour))}
+    extra_banlist = args.banlist_extra if os.path.exists(args.banlist_extra) else None
+    written = export_variants(pool_from_confs(conf_files, extra_banlist), args.out)
+    print(f"{len(written)} banlists up to date in {args.out}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from dmvr import metrics
+
+YGOPRODECK_URL = "https://db.ygoprodeck.com/api/v7/cardinfo.php"
+
+# YGOPRODeck allows 20 requests per second; stay a little under it.
+DEFAULT_RATE = 15
+DEFAULT_WORKERS = 8
+MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Returned by lookup() when the API could not be reached, as opposed to "no such card"
+LOOKUP_FAILED = "error"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that spaces requests to hold a steady rate.
+    capacity is the burst allowed after an idle spell; the default of one token
+    spaces every request 1/rate apart, so no one-second window exceeds the rate.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class YgoprodeckClient:
+    """
+    Pooled keep-alive client for cardinfo.php.
+    All threads share one session and one rate limiter; 429 and 5xx responses
+    are retried with exponential backoff (honouring Retry-After when present).
+    """
+
+    def __init__(self, base_url=YGOPRODECK_URL, rate=DEFAULT_RATE, workers=DEFAULT_WORKERS,
+                 max_retries=MAX_RETRIES, backoff=0.5, timeout=10):
+        self.base_url = base_url
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def query(self, param, value):
+        """
+        Run one cardinfo.php query and return the first card's ID, or None.
+        Raises requests.RequestException if the API stays unreachable after all retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            with metrics.timer("ygoprodeck_wait_seconds"):
+                self.limiter.acquire()
+            try:
+                with metrics.timer("ygoprodeck_request_seconds", param=param):
+                    response = self.session.get(self.base_url, params={param: value}, timeout=self.timeout)
+            except requests.RequestException:
+                metrics.count("ygoprodeck_responses_total", status="error")
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+
+            metrics.count("ygoprodeck_responses_total", status=response.status_code)
+            if response.status_code in RETRY_STATUSES:
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt
+                time.sleep(delay)
+                continue
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if "data" in data and isinstance(data["data"], list) and len(data["data"]) > 0:
+                return str(data["data"][0].get("id"))
+            return None
+        return None
+
+    def lookup(self, name, fuzzy=True):
+        """
+        Exact search, then fuzzy search. Returns (card_id, param), (None, None) if
+        the card is unknown, or (None, LOOKUP_FAILED) if the API could not be reached.
+        """
+        params = ("name", "fname") if fuzzy else ("name",)
+        for param in params:
+            try:
+                card_id = self.query(param, name)
+            except requests.RequestException as e:
+                print(f"Error querying YGOPRODeck for '{name}': {e}")
+                return None, LOOKUP_FAILED
+            if card_id is not None:
+                return card_id, param
+        return None, None
+
+    def lookup_many(self, names, fuzzy=True):
+        """Look up many names concurrently; results are returned in input order."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda name: self.lookup(name, fuzzy), names))
+
+    def close(self):
+        self.session.close()
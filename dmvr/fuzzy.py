@@ -0,0 +1,175 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import chain
+
+from dmvr.names import ALIASES, clean_card_name, name_key
+
+NGRAM_SIZE = 3
+# Similar names are often different cards ("Elemental HERO Gaia" / "Avian"), so matches are only suggestions
+DEFAULT_THRESHOLD = 0.7
+CANDIDATES_TO_RERANK = 8
+MIN_RARE_NGRAMS = 4
+
+
+def alias_keys(aliases=ALIASES):
+    """{name_key() of a current name: [keys of its old and regional names]}."""
+    keys = defaultdict(list)
+    for alias, name in aliases.items():
+        keys[name].append(alias)
+    return keys
+
+
+ALIAS_KEYS = alias_keys()
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    """Return the set of padded character n-grams of a name_key()."""
+    padded = f"  {text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def edit_distance(a, b):
+    """Levenshtein distance using Hyyrö's bit-parallel algorithm (one pass over b)."""
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    mask = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+    peq = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    pv, mv, score = mask, 0, len(a)
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score
+
+
+def similarity(a, b):
+    """Normalised edit similarity in [0, 1]."""
+    longest = max(len(a), len(b))
+    if longest == 0:
+        return 1.0
+    return 1.0 - edit_distance(a, b) / longest
+
+
+class FuzzyNameIndex:
+    """
+    Approximate card name matcher.
+    Names are keyed by name_key(), the key every exact lookup uses, and split into
+    character trigrams with a postings list per trigram; a card's old and regional
+    names (names.ALIASES) are indexed too, under the current name. A query scores
+    candidates by shared trigrams (Dice coefficient), then re-ranks the best few
+    by edit distance.
+    """
+
+    def __init__(self, names_to_ids=None):
+        self.names = []
+        self.ids = []
+        self.keys = []
+        self.gram_counts = []
+        self.postings = defaultdict(list)
+        self._seen = {}
+        self.cards = 0
+        if names_to_ids:
+            self.add_many(names_to_ids.items())
+
+    def add(self, name, card_id):
+        key = name_key(name)
+        if not key:
+            return
+        slot = self._seen.get(key)
+        if slot is not None:
+            # Another print of a known card: the plain name wins over e.g. "(Anime)", as in exact lookups
+            if name == clean_card_name(name) and self.names[slot] != clean_card_name(self.names[slot]):
+                for entry in map(self._seen.get, (key, *ALIAS_KEYS.get(key, ()))):
+                    if entry is not None:
+                        self.names[entry] = name
+                        self.ids[entry] = str(card_id)
+            return
+        self.cards += 1
+        self._add_entry(key, name, card_id)
+        for alias in ALIAS_KEYS.get(key, ()):
+            if alias not in self._seen:
+                self._add_entry(alias, name, card_id)
+
+    def _add_entry(self, key, name, card_id):
+        slot = len(self.names)
+        self._seen[key] = slot
+        grams = ngrams(key)
+        self.names.append(name)
+        self.ids.append(str(card_id))
+        self.keys.append(key)
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            self.postings[gram].append(slot)
+
+    def add_many(self, pairs):
+        for name, card_id in pairs:
+            self.add(name, card_id)
+
+    def __len__(self):
+        return self.cards
+
+    def search(self, query, limit=5):
+        """Return up to `limit` (name, card_id, score) tuples, best first; a card appears once."""
+        key = name_key(query)
+        if not key:
+            return []
+        slot = self._seen.get(key)
+        if slot is not None:
+            return [(self.names[slot], self.ids[slot], 1.0)]
+
+        grams = ngrams(key)
+        postings = self.postings
+        lists = [postings[gram] for gram in grams if gram in postings]
+        # Very common n-grams ("dra", "gon") add little signal but dominate the
+        # counting cost, so candidates come from the rarer ones when there are enough.
+        common = len(self.names) // 20
+        rare = [ids for ids in lists if len(ids) <= common]
+        if len(rare) >= MIN_RARE_NGRAMS:
+            lists = rare
+        shared = Counter(chain.from_iterable(lists))
+        if not shared:
+            return []
+
+        # Only names sharing at least half as many n-grams as the best one can rank near the top
+        cutoff = max(shared.values()) / 2
+        query_count = len(grams)
+        gram_counts = self.gram_counts
+        best = heapq.nlargest(
+            CANDIDATES_TO_RERANK,
+            ((slot, count) for slot, count in shared.items() if count >= cutoff),
+            key=lambda item: 2.0 * item[1] / (query_count + gram_counts[item[0]]),
+        )
+        ranked = sorted(
+            ((similarity(key, self.keys[slot]), slot) for slot, _ in best),
+            reverse=True,
+        )
+        results, seen_ids = [], set()
+        for score, slot in ranked:
+            # A card found under its current and an old name is listed once, with the better score
+            if self.ids[slot] not in seen_ids:
+                seen_ids.add(self.ids[slot])
+                results.append((self.names[slot], self.ids[slot], round(score, 4)))
+        return results[:limit]
+
+    def suggest(self, query, limit=3, threshold=DEFAULT_THRESHOLD):
+        """
+        Up to `limit` (name, card_id, score) candidates at or above the threshold, best first.
+        These are shown to whoever fixes the list; they are never taken as a match.
+        """
+        return [result for result in self.search(query, limit) if result[2] >= threshold]
@@ -0,0 +1,357 @@
+"""
+Keep every applied pool state and answer questions across them:
+
+    python -m dmvr.history record [--label 2026-10] [--red OnlyRedCards.conf ...] [--banlist-extra BanlistExtra.txt]
+    python -m dmvr.history log
+    python -m dmvr.history diff [OLD [NEW]]           (default: the last two revisions)
+    python -m dmvr.history timeline <id or name>
+    python -m dmvr.history changes [--last 3] [--restriction | --colour]
+
+Each revision is a columnar snapshot of the pool: the sorted ID column and, slot
+for slot, the colour, restriction, flags and name columns. Columns are stored
+once under their SHA-256 in objects/, so a revision that only moved a few
+restrictions stores a new restriction column and reuses every other column.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+
+from dmvr.names import name_key
+from dmvr.partition import DEFAULT_PRECEDENCE
+from dmvr.snapshot import COLOUR_CODES, COLOUR_NAMES, FLAG_EXTRA_DECK, PoolSnapshot, pool_from_confs
+
+HISTORY_DIR = ".dmvr_history"
+REVISIONS_FILE = "revisions.json"
+OBJECTS_DIR = "objects"
+
+COLUMNS = ("ids", "colours", "restrictions", "flags", "names")
+
+# Columns are stored little-endian, like the snapshot
+NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def encode_ids(ids):
+    column = array("I", ids)
+    if not NATIVE_LITTLE_ENDIAN:
+        column.byteswap()
+    return column.tobytes()
+
+
+def decode_ids(data):
+    column = array("I")
+    column.frombytes(data)
+    if not NATIVE_LITTLE_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def encode_columns(cards):
+    """
+    The raw columns of a pool state from (card_id, colour, restriction, extra_deck, name)
+    tuples, sorted by ID. A card ID that occurs twice keeps its first record.
+    """
+    records = {}
+    for card_id, colour, restriction, extra_deck, name in cards:
+        records.setdefault(int(card_id), (COLOUR_CODES[colour], int(restriction), bool(extra_deck), name))
+    ids = sorted(records)
+    rows = [records[card_id] for card_id in ids]
+    return {
+        "ids": encode_ids(ids),
+        "colours": bytes(row[0] for row in rows),
+        "restrictions": bytes(row[1] for row in rows),
+        "flags": bytes(FLAG_EXTRA_DECK if row[2] else 0 for row in rows),
+        "names": "\n".join(row[3] for row in rows).encode("utf-8"),
+    }
+
+
+class PoolHistory:
+    """
+    The revisions in a history directory, oldest first. Columns are read lazily and
+    kept decoded by hash, so revisions sharing a column share one copy in memory too.
+    Revisions are referred to by number (1 is the oldest, -1 the latest) or by label.
+    """
+
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+        self.revisions = []
+        revisions_file = os.path.join(path, REVISIONS_FILE)
+        if os.path.exists(revisions_file):
+            with open(revisions_file, "r", encoding="utf-8") as f:
+                self.revisions = json.load(f)
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.revisions)
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, OBJECTS_DIR, digest[:2], digest[2:])
+
+    def _store_object(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp_path, path)
+        return digest, True
+
+    def _save(self):
+        path = os.path.join(self.path, REVISIONS_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.revisions, f, indent=1)
+        os.replace(tmp_path, path)
+
+    def record(self, cards, label=None):
+        """
+        Add the pool state of cards ((card_id, colour, restriction, extra_deck, name) tuples)
+        as a new revision and return its number. A state identical to the latest revision
+        is not recorded again; that revision's number is returned instead.
+        """
+        columns = encode_columns(cards)
+        digests = {name: hashlib.sha256(data).hexdigest() for name, data in columns.items()}
+        if self.revisions and self.revisions[-1]["columns"] == digests:
+            return len(self.revisions)
+        os.makedirs(self.path, exist_ok=True)
+        stored = [name for name in COLUMNS if self._store_object(columns[name])[1]]
+        number = len(self.revisions) + 1
+        self.revisions.append({
+            "revision": number,
+            "label": label or time.strftime("%Y-%m-%d %H:%M:%S"),
+            "recorded": time.time(),
+            "cards": len(columns["ids"]) // 4,
+            "columns": digests,
+            "new_columns": stored,
+        })
+        self._save()
+        return number
+
+    def number(self, ref):
+        """The 1-based number of a revision given by label, number or negative offset from the end."""
+        for revision in self.revisions:
+            if revision["label"] == ref:
+                return revision["revision"]
+        try:
+            number = int(ref)
+        except (TypeError, ValueError):
+            raise KeyError(f"no revision {ref!r}") from None
+        if number < 0:
+            number += len(self.revisions) + 1
+        if not 1 <= number <= len(self.revisions):
+            raise KeyError(f"no revision {ref!r}")
+        return number
+
+    def column(self, number, name):
+        digest = self.revisions[number - 1]["columns"][name]
+        column = self._columns.get(digest)
+        if column is None:
+            with open(self._object_path(digest), "rb") as f:
+                data = zlib.decompress(f.read())
+            if name == "ids":
+                column = decode_ids(data)
+            elif name == "names":
+                column = data.decode("utf-8").split("\n") if data else []
+            else:
+                column = data
+            self._columns[digest] = column
+        return column
+
+    def state(self, number, card_id):
+        """(colour, restriction, name) of a card in a revision, or None if it was not in the pool."""
+        ids = self.column(number, "ids")
+        slot = bisect_left(ids, card_id)
+        if slot == len(ids) or ids[slot] != card_id:
+            return None
+        return (COLOUR_NAMES[self.column(number, "colours")[slot]], self.column(number, "restrictions")[slot],
+                self.column(number, "names")[slot])
+
+    def diff(self, old, new):
+        """
+        [(card_id, name, (colour, restriction) before or None, after or None)] for every card
+        that was added, removed or changed between two revision numbers, in ID order.
+        The two sorted ID columns are merged in one scan; columns with the same hash are not compared.
+        """
+        old_digests = self.revisions[old - 1]["columns"]
+        new_digests = self.revisions[new - 1]["columns"]
+        same = {name for name in COLUMNS if old_digests[name] == new_digests[name]}
+        if {"ids", "colours", "restrictions"} <= same:
+            return []
+        old_ids, new_ids = self.column(old, "ids"), self.column(new, "ids")
+        old_colours, new_colours = self.column(old, "colours"), self.column(new, "colours")
+        old_restrictions, new_restrictions = self.column(old, "restrictions"), self.column(new, "restrictions")
+        old_names, new_names = self.column(old, "names"), self.column(new, "names")
+
+        changes = []
+        if "ids" in same:  # Same cards in the same slots: only the changed columns need a look
+            for slot in range(len(new_ids)):
+                if old_colours[slot] != new_colours[slot] or old_restrictions[slot] != new_restrictions[slot]:
+                    changes.append((new_ids[slot], new_names[slot],
+                                    (COLOUR_NAMES[old_colours[slot]], old_restrictions[slot]),
+                                    (COLOUR_NAMES[new_colours[slot]], new_restrictions[slot])))
+            return changes
+
+        i = j = 0
+        while i < len(old_ids) or j < len(new_ids):
+            old_id = old_ids[i] if i < len(old_ids) else None
+            new_id = new_ids[j] if j < len(new_ids) else None
+            if new_id is None or (old_id is not None and old_id < new_id):
+                changes.append((old_id, old_names[i], (COLOUR_NAMES[old_colours[i]], old_restrictions[i]), None))
+                i += 1
+            elif old_id is None or new_id < old_id:
+                changes.append((new_id, new_names[j], None, (COLOUR_NAMES[new_colours[j]], new_restrictions[j])))
+                j += 1
+            else:
+                if old_colours[i] != new_colours[j] or old_restrictions[i] != new_restrictions[j]:
+                    changes.append((new_id, new_names[j], (COLOUR_NAMES[old_colours[i]], old_restrictions[i]),
+                                    (COLOUR_NAMES[new_colours[j]], new_restrictions[j])))
+                i += 1
+                j += 1
+        return changes
+
+    def timeline(self, card_id):
+        """
+        [(revision number, (colour, restriction) or None)] for the first revision and every
+        revision in which the card's state changed. Revisions whose ID, colour and
+        restriction columns are the same as the previous one's are skipped without a lookup.
+        """
+        card_id = int(card_id)
+        timeline = []
+        previous_digests = None
+        for revision in self.revisions:
+            digests = tuple(revision["columns"][name] for name in ("ids", "colours", "restrictions"))
+            if digests == previous_digests:
+                continue
+            previous_digests = digests
+            state = self.state(revision["revision"], card_id)
+            if state is not None:
+                state = state[:2]
+            if not timeline or timeline[-1][1] != state:
+                timeline.append((revision["revision"], state))
+        return timeline
+
+    def find(self, name):
+        """The ID of a card name (by name_key()), looked up from the latest revision backwards, or None."""
+        key = name_key(name)
+        searched = set()
+        for number in range(len(self.revisions), 0, -1):
+            digest = self.revisions[number - 1]["columns"]["names"]
+            if digest in searched:
+                continue
+            searched.add(digest)
+            for slot, candidate in enumerate(self.column(number, "names")):
+                if name_key(candidate) == key:
+                    return self.column(number, "ids")[slot]
+        return None
+
+    def name(self, card_id):
+        for number in range(len(self.revisions), 0, -1):
+            state = self.state(number, card_id)
+            if state:
+                return state[2]
+        return str(card_id)
+
+
+def describe(state):
+    return "not in the pool" if state is None else f"{state[0]} {state[1]}"
+
+
+def print_changes(changes, kind=None):
+    shown = 0
+    for card_id, name, before, after in changes:
+        if kind == "restriction" and not (before and after and before[1] != after[1]):
+            continue
+        if kind == "colour" and not (before and after and before[0] != after[0]):
+            continue
+        print(f"  {card_id} {name}: {describe(before)} -> {describe(after)}")
+        shown += 1
+    return shown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record pool revisions and query how cards moved between them.")
+    parser.add_argument("--history", default=HISTORY_DIR, help=f"history directory (default: {HISTORY_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record the current colour lists as a new revision")
+    for colour in DEFAULT_PRECEDENCE:
+        record.add_argument(f"--{colour}", default=f"Only{colour.capitalize()}Cards.conf")
+    record.add_argument("--banlist-extra", help="BanlistExtra.txt, to flag extra deck monsters")
+    record.add_argument("--snapshot", help="record a pool.snap instead of the .conf lists")
+    record.add_argument("--label", help="name of the revision (default: the current time)")
+    commands.add_parser("log", help="list the revisions")
+    diff = commands.add_parser("diff", help="cards added, removed or changed between two revisions")
+    diff.add_argument("old", nargs="?", default="-2")
+    diff.add_argument("new", nargs="?", default="-1")
+    timeline = commands.add_parser("timeline", help="the colour and restriction of a card in every revision")
+    timeline.add_argument("card", help="card ID or name")
+    changes = commands.add_parser("changes", help="every change in the last revisions")
+    changes.add_argument("--last", type=int, default=3, help="number of revisions to look back (default: 3)")
+    kind = changes.add_mutually_exclusive_group()
+    kind.add_argument("--restriction", dest="kind", action="store_const", const="restriction",
+                      help="only cards whose restriction changed")
+    kind.add_argument("--colour", dest="kind", action="store_const", const="colour",
+                      help="only cards whose colour changed")
+    args = parser.parse_args()
+
+    history = PoolHistory(args.history)
+    if args.command == "record":
+        if args.snapshot:
+            with PoolSnapshot(args.snapshot) as snapshot:
+                cards = list(snapshot)
+        else:
+            conf_files = {colour: getattr(args, colour) for colour in DEFAULT_PRECEDENCE
+                          if os.path.exists(getattr(args, colour))}
+            cards = list(pool_from_confs(conf_files, args.banlist_extra))
+        before = len(history)
+        number = history.record(cards, args.label)
+        if number == before:
+            print(f"The pool is unchanged since revision {number}; nothing recorded.")
+        else:
+            revision = history.revisions[-1]
+            print(f"Recorded revision {number} ({revision['label']}): {revision['cards']} cards, "
+                  f"new columns: {', '.join(revision['new_columns']) or 'none'}.")
+        return
+
+    if not history.revisions:
+        print(f"No revisions in {args.history}; run 'record' first.")
+        raise SystemExit(1)
+    try:
+        if args.command == "log":
+            for revision in history.revisions:
+                print(f"{revision['revision']:>4}  {revision['label']:<22}{revision['cards']:>7} cards  "
+                      f"new columns: {', '.join(revision['new_columns']) or 'none'}")
+        elif args.command == "diff":
+            old, new = history.number(args.old), history.number(args.new)
+            changes = history.diff(old, new)
+            print(f"Revision {old} -> {new}: {len(changes)} cards changed.")
+            print_changes(changes)
+        elif args.command == "timeline":
+            card_id = int(args.card) if args.card.isdigit() else history.find(args.card)
+            if card_id is None:
+                print(f"{args.card}: never in the pool")
+                raise SystemExit(1)
+            print(f"{card_id} {history.name(card_id)}:")
+            for number, state in history.timeline(card_id):
+                print(f"  revision {number} ({history.revisions[number - 1]['label']}): {describe(state)}")
+        elif args.command == "changes":
+            first = max(1, len(history) - args.last)
+            for old in range(first, len(history)):
+                changes = history.diff(old, old + 1)
+                print(f"Revision {old} -> {old + 1} ({history.revisions[old]['label']}):")
+                if not print_changes(changes, args.kind):
+                    print("  no changes")
+    except KeyError as e:
+        print(e.args[0])
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
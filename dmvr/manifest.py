@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = ".dmvr_manifest.json"
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def diff_states(old, new):
+    """
+    Compare two {card_id: value} states.
+    Returns {card_id: (old_value, new_value)} for every added, removed or changed card;
+    a missing side is None.
+    """
+    delta = {}
+    for card_id, value in new.items():
+        previous = old.get(card_id)
+        if previous != value:
+            delta[card_id] = (previous, value)
+    for card_id, previous in old.items():
+        if card_id not in new:
+            delta[card_id] = (previous, None)
+    return delta
+
+
+class Manifest:
+    """
+    Last applied state of each pipeline stage, stored as JSON next to its inputs.
+    For every stage it keeps the content hashes of the input files and a
+    {card_id: state} map, so the next run can work out what actually moved.
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.stages = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.stages = json.load(f).get("stages", {})
+
+    def inputs_unchanged(self, stage, paths):
+        """True if every input file hashes the same as when the stage was last applied."""
+        recorded = self.stages.get(stage, {}).get("inputs")
+        if not recorded:
+            return False
+        return all(recorded.get(path) == file_hash(path) for path in paths)
+
+    def cards(self, stage):
+        """The {card_id: state} map recorded for a stage (empty if never applied)."""
+        return self.stages.get(stage, {}).get("cards", {})
+
+    def record(self, stage, paths, cards):
+        """Remember a stage's inputs and resulting card state."""
+        self.stages[stage] = {
+            "inputs": {path: file_hash(path) for path in paths},
+            "cards": cards,
+        }
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,223 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+# Set either variable to turn instrumentation on for any script or the pipeline
+REPORT_FILE = os.environ.get("DMVR_METRICS_JSON")
+TEXTFILE = os.environ.get("DMVR_METRICS_PROM")
+
+PREFIX = "dmvr_"
+
+# Shared by every disabled timer() call, so nothing is allocated when metrics are off
+_NULL_TIMER = nullcontext()
+
+
+class Registry:
+    """Counters and timers for one run, keyed by (metric name, sorted label pairs)."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}  # key -> [count, total seconds, max seconds]
+
+    @staticmethod
+    def _key(name, labels):
+        # Label values are text in Prometheus; stringifying them also keeps keys with mixed values sortable
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def count(self, name, value, labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, labels):
+        key = self._key(name, labels)
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+
+
+_registry = None
+
+
+def enabled():
+    return _registry is not None
+
+
+def enable():
+    """Start collecting metrics (idempotent). Returns the registry."""
+    global _registry
+    if _registry is None:
+        _registry = Registry()
+    return _registry
+
+
+def disable():
+    global _registry
+    _registry = None
+
+
+def count(name, value=1, **labels):
+    """Add value to a counter. A no-op while metrics are disabled."""
+    if _registry is not None:
+        _registry.count(name, value, labels)
+
+
+def observe(name, seconds, **labels):
+    """Record a duration measured elsewhere (e.g. in a worker process)."""
+    if _registry is not None:
+        _registry.observe(name, seconds, labels)
+
+
+def timer(name, **labels):
+    """Context manager that records how long its block took."""
+    if _registry is None:
+        return _NULL_TIMER
+    return _Timer(_registry, name, labels)
+
+
+def timed(name, **labels):
+    """Decorator version of timer() for whole functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _registry is None:
+                return func(*args, **kwargs)
+            with _Timer(_registry, name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _hit_rates(counters):
+    """Share of each resolution source and the cache hit rate, derived from the counters."""
+    sources, cache = {}, {}
+    for (name, labels), value in counters.items():
+        labels = dict(labels)
+        if name == "card_lookups_total":
+            sources[labels["source"]] = sources.get(labels["source"], 0) + value
+        elif name == "cache_requests_total":
+            cache[labels["result"]] = cache.get(labels["result"], 0) + value
+    rates = {}
+    if sources:
+        total = sum(sources.values())
+        rates["sources"] = {source: round(value / total, 4) for source, value in sorted(sources.items())}
+    if cache:
+        rates["cache_hit_rate"] = round(cache.get("hit", 0) / sum(cache.values()), 4)
+    return rates
+
+
+def report():
+    """The collected metrics as a JSON-serialisable dict."""
+    registry = _registry
+    if registry is None:
+        return None
+    with registry.lock:
+        counters = dict(registry.counters)
+        timers = {key: list(value) for key, value in registry.timers.items()}
+    return {
+        "script": os.path.basename(sys.argv[0]),
+        "started": registry.started,
+        "duration_seconds": round(time.time() - registry.started, 4),
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(counters.items())
+        ],
+        "timers": [
+            {"name": name, "labels": dict(labels), "count": n, "total_seconds": round(total, 6),
+             "max_seconds": round(longest, 6)}
+            for (name, labels), (n, total, longest) in sorted(timers.items())
+        ],
+        "hit_rates": _hit_rates(counters),
+    }
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escape = {ord("\\"): "\\\\", ord('"'): '\\"', ord("\n"): "\\n"}
+    return "{" + ",".join(f'{key}="{str(value).translate(escape)}"' for key, value in labels) + "}"
+
+
+def prometheus_text():
+    """The collected metrics in the Prometheus text exposition format."""
+    data = report()
+    if data is None:
+        return ""
+    registry = _registry
+    with registry.lock:
+        counters = sorted(registry.counters.items())
+        timers = sorted(registry.timers.items())
+    script = (("script", data["script"]),)
+    lines = []
+    seen = set()
+    for (name, labels), value in counters:
+        metric = PREFIX + name
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_format_labels(script + labels)} {value}")
+    for (name, labels), (n, total, _) in timers:
+        metric = PREFIX + name
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} summary")
+        lines.append(f"{metric}_count{_format_labels(script + labels)} {n}")
+        lines.append(f"{metric}_sum{_format_labels(script + labels)} {total:.6f}")
+    lines.append(f"# TYPE {PREFIX}run_duration_seconds gauge")
+    lines.append(f"{PREFIX}run_duration_seconds{_format_labels(script)} {data['duration_seconds']}")
+    lines.append(f"# TYPE {PREFIX}run_timestamp_seconds gauge")
+    lines.append(f"{PREFIX}run_timestamp_seconds{_format_labels(script)} {int(data['started'])}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    # The node_exporter textfile collector must never see a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_reports(report_file=None, textfile=None):
+    """Write the JSON run report and/or the Prometheus textfile (defaults from the environment)."""
+    report_file = report_file or REPORT_FILE
+    textfile = textfile or TEXTFILE
+    if _registry is None:
+        return
+    if report_file:
+        _write_atomic(report_file, json.dumps(report(), indent=2) + "\n")
+    if textfile:
+        _write_atomic(textfile, prometheus_text())
+
+
+if REPORT_FILE or TEXTFILE:
+    enable()
+    atexit.register(write_reports)
@@ -0,0 +1,99 @@
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+# Designations that mark another print of a card, not another card
+SUFFIXES = ("Anime", "Manga", "VG", "Video Game", "Alternative Artwork", "Alt")
+SUFFIX_PATTERN = re.compile(r"\s*\((?:" + "|".join(map(re.escape, SUFFIXES)) + r")\)", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Typographic quotes and dashes as they appear in the lists and dumps
+PUNCTUATION = str.maketrans({
+    "‘": "'", "’": "'", "‛": "'", "′": "'", "`": "'", "´": "'",
+    "“": '"', "”": '"', "„": '"', "″": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "−": "-",
+})
+
+# Old or regional card names, one "alias<TAB>current name" per line
+ALIASES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aliases.tsv")
+
+
+def clean_card_name(card_name):
+    """Remove the print designations and surplus whitespace from a card name; case and spelling are kept."""
+    return WHITESPACE_PATTERN.sub(" ", SUFFIX_PATTERN.sub("", card_name)).strip()
+
+
+def fold_name(card_name):
+    """Compatibility-normalised, case-folded clean name, with straight quotes and dashes."""
+    name = unicodedata.normalize("NFKC", card_name).translate(PUNCTUATION)
+    return clean_card_name(name).casefold()
+
+
+def load_aliases(path=ALIASES_FILE):
+    """{folded alias: folded current name} from an aliases file; a missing file means no aliases."""
+    aliases = {}
+    if not os.path.exists(path):
+        return aliases
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            alias, _, name = line.rstrip("\n").partition("\t")
+            if name.strip():
+                aliases[fold_name(alias)] = fold_name(name)
+    return aliases
+
+
+ALIASES = load_aliases()
+
+
+def name_key(card_name):
+    """
+    The key every name join goes through: the folded name, with old and
+    regional names mapped to the current one. Two spellings of the same card
+    ("B. Skull Dragon", "Black Skull Dragon (Anime)", "black skull dragon") get the same key.
+    """
+    if (card_name.isascii() and card_name.isprintable() and "(" not in card_name and "`" not in card_name
+            and "  " not in card_name and card_name[:1] != " " and card_name[-1:] != " "):
+        key = card_name.lower()  # Most names are plain ASCII, where folding is just lowercasing
+    else:
+        key = _fold_name_cached(card_name)
+    return ALIASES.get(key, key)
+
+
+_fold_name_cached = lru_cache(maxsize=1 << 16)(fold_name)
+
+
+def key_index(mapping):
+    """{name_key(name): value} for a {name: value} mapping; the first name of a card wins."""
+    index = {}
+    for name, value in mapping.items():
+        index.setdefault(name_key(name), value)
+    return index
+
+
+class NameIndex:
+    """
+    Read-only {name: value} lookups by card name. The exact name is tried first;
+    only when that misses is the name_key() index built (once) and consulted, so
+    lists that already spell every name the same way never pay for normalising.
+    """
+
+    def __init__(self, mapping):
+        self.exact = mapping
+        self._by_key = None
+
+    def __len__(self):
+        return len(self.exact)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def get(self, name, default=None):
+        value = self.exact.get(name)
+        if value is not None:
+            return value
+        if self._by_key is None:
+            self._by_key = key_index(self.exact)
+        return self._by_key.get(name_key(name), default)
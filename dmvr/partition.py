@@ -0,0 +1,80 @@
+from itertools import combinations
+
+COLOURS = ("red", "blue", "white")
+
+# A card listed in several colours ends up in the first one of these
+DEFAULT_PRECEDENCE = ("red", "blue", "white")
+
+CONFLICTS_FILE = "colour_conflicts.txt"
+
+
+def to_id_set(card_ids):
+    """
+    Card IDs as a set of ints, so "0123" and "123" are the same card.
+    The "00000000" placeholder for unresolved cards is left out.
+    """
+    ids = set(map(int, card_ids))
+    ids.discard(0)
+    return ids
+
+
+class ColourPartition:
+    """
+    Splits card IDs into disjoint colours in one pass over the lists.
+    `lists` maps colour -> listed IDs. Every card goes to the first colour in
+    `precedence` that lists it; pool IDs listed nowhere go to the `fill` colour,
+    so white = (pool | white list) - red - blue. Overlaps between every pair of
+    lists are kept for the conflict report.
+    """
+
+    def __init__(self, lists, pool=(), precedence=DEFAULT_PRECEDENCE, fill="white"):
+        self.precedence = tuple(precedence)
+        self.listed = {colour: to_id_set(lists.get(colour, ())) for colour in self.precedence}
+        self.pool = to_id_set(pool)
+        self.overlaps = {(a, b): self.listed[a] & self.listed[b] for a, b in combinations(self.precedence, 2)}
+
+        self.colours = {}
+        claimed = set()
+        for colour in self.precedence:
+            ids = self.listed[colour] | self.pool if colour == fill else self.listed[colour]
+            self.colours[colour] = ids - claimed
+            claimed |= ids
+
+    def removed(self, colour):
+        """IDs listed in colour that belong to a colour with higher precedence."""
+        return self.listed[colour] - self.colours[colour]
+
+    def colour_of(self, card_id):
+        """The colour a card ended up in, or None."""
+        card_id = int(card_id)
+        return next((colour for colour in self.precedence if card_id in self.colours[colour]), None)
+
+    def targets(self):
+        """{card ID: colour} for every assigned card."""
+        return {card_id: colour for colour, ids in self.colours.items() for card_id in ids}
+
+    def conflicts(self):
+        """Sorted (card ID, colours listing it, winning colour) for every card listed more than once."""
+        conflicted = set().union(*self.overlaps.values())
+        return [
+            (card_id, [colour for colour in self.precedence if card_id in self.listed[colour]],
+             self.colour_of(card_id))
+            for card_id in sorted(conflicted)
+        ]
+
+    def summary(self):
+        """One line per pair of colours with the number of shared IDs."""
+        return [f"{a}/{b}: {len(ids)} cards listed in both" for (a, b), ids in self.overlaps.items()]
+
+    def write_report(self, path, names=None):
+        """Write the pairwise overlap counts and every conflicting card; returns the number of conflicts."""
+        names = names or {}
+        conflicts = self.conflicts()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# Colour conflicts, resolved by precedence {' > '.join(self.precedence)}\n")
+            for line in self.summary():
+                f.write(f"# {line}\n")
+            for card_id, colours, winner in conflicts:
+                name = names.get(str(card_id), "")
+                f.write(f"{card_id}\t{name}\tlisted in {', '.join(colours)}\t-> {winner}\n")
+        return len(conflicts)
@@ -0,0 +1,440 @@
+"""
+Run the whole DMVR workflow with one command:
+
+    python -m dmvr.pipeline [--out build] [--cdb cards.cdb ...] [--offline cardData.json]
+
+Stages form a DAG and pass their results to each other in memory. Every stage
+result is cached under .cache/pipeline by a hash of its input files, its
+parameters and the keys of the stages it depends on, so a rerun skips every
+stage whose inputs are unchanged. Independent stages run concurrently.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dmvr import metrics, resolver
+from dmvr.allcards import iter_all_cards
+from dmvr.banlist import EXTRA_TIER_COLOURS, parse_banlist, parse_extra_banlist
+from dmvr.export import export_variants
+from dmvr.history import PoolHistory
+from dmvr.manifest import MANIFEST_FILE, Manifest, file_hash
+from dmvr.names import ALIASES_FILE, NameIndex, name_key
+from dmvr.partition import CONFLICTS_FILE, ColourPartition
+from dmvr.poolcdb import POOL_CDB_FILE, build_pool_cdb
+from dmvr.relabel import relabel_databases
+from dmvr.resolver import resolve_many, use_card_dump
+from dmvr.snapshot import SNAPSHOT_FILE, source_digest, write_snapshot
+from dmvr.validate import validate_entries
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "pipeline")
+
+COLOURS = ("red", "blue", "white")
+
+UNMATCHED_FILE = "unmatched_cards.txt"
+HISTORY_DIR = "history"
+
+# Pipeline inputs, relative to the repository root
+DEFAULT_INPUTS = {
+    "red_names": "ImplementIDsFromCDBfilterFiles/OnlyRedCards.txt",
+    "blue_names": "ImplementIDsFromCDBfilterFiles/OnlyBlueCards.txt",
+    "white_names": "ImplementIDsFromCDBfilterFiles/OnlyWhiteCards.txt",
+    "all_cards": "ExtractWhiteCardsFromCSV/AllCards.csv",
+    "banlist": "AddBanlisTierToCards/Banlist.txt",
+    "banlist_extra": "AddBanlisTierToCards/BanlistExtra.txt",
+}
+
+class Stage:
+    """
+    One node of the pipeline.
+    func(ctx, **dep_results) computes the result. `inputs` names the ctx.inputs
+    files the stage reads; `params` returns anything else that should invalidate
+    the cache. Stages with `outputs` return {path: hash} and are only considered
+    cached while those files still hash the same.
+    """
+
+    def __init__(self, name, func, deps=(), inputs=(), params=None, version=1, cache=True, outputs=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+        self.params = params or (lambda ctx: None)
+        self.version = version
+        self.cache = cache
+        self.outputs = outputs
+
+
+class Context:
+    """Paths and options shared by every stage."""
+
+    def __init__(self, inputs, out_dir, cdb_files=(), offline=None, dry_run=False, skip_validation=False):
+        self.inputs = inputs
+        self.out_dir = out_dir
+        self.cdb_files = list(cdb_files)
+        self.offline = offline
+        self.dry_run = dry_run
+        self.skip_validation = skip_validation
+        self._resolver_state = None
+
+    def resolver_state(self):
+        """
+        Hashes of what name resolution reads besides the names: the offline dump and
+        the Ignis databases. Several stages resolve names, so the files are hashed once.
+        """
+        if self._resolver_state is None:
+            self._resolver_state = {
+                "offline": self.offline and file_hash(self.offline),
+                "ignis": {path: file_hash(path) for path in resolver.IGNIS_DB_FILES},
+            }
+        return self._resolver_state
+
+
+def read_names(path):
+    """Non-empty, stripped lines of a name list."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def stage_resolve_lists(ctx):
+    """Resolve the hand-maintained red/blue/white name lists to IDs."""
+    names = {colour: read_names(ctx.inputs[f"{colour}_names"]) for colour in COLOURS}
+    flat = [name for colour in COLOURS for name in names[colour]]
+    ids = iter(resolve_many(flat))
+    result = {"not_found": []}
+    for colour in COLOURS:
+        result[colour] = []
+        for name in names[colour]:
+            card_id = next(ids)
+            if card_id:
+                result[colour].append((card_id, name))
+            else:
+                result["not_found"].append(name)
+    return result
+
+
+def stage_pool_white(ctx, resolve_lists):
+    """Every pool card from AllCards.csv that is neither red nor blue, and the names that could not be resolved."""
+    coloured = {card_id for colour in ("red", "blue") for card_id, _ in resolve_lists[colour]}
+    white = {}
+    unresolved = []
+    for card in iter_all_cards(ctx.inputs["all_cards"]):
+        if not card.card_id.isdigit():
+            unresolved.append(card.name)
+        elif card.card_id not in coloured:
+            white[card.card_id] = card.name
+    not_found = []
+    for name, card_id in zip(unresolved, resolve_many(unresolved)):
+        if not card_id:
+            not_found.append(name)
+        elif card_id not in coloured:
+            white[card_id] = name
+    return {"cards": sorted(white.items()), "not_found": not_found}
+
+
+def stage_extra_deck(ctx):
+    """Resolve the extra deck monsters of BanlistExtra.txt, grouped by colour."""
+    tiers = parse_extra_banlist(ctx.inputs["banlist_extra"])
+    flat = [(tier, name) for tier, names in tiers.items() for name in names]
+    ids = resolve_many([name for _, name in flat])
+    result = {colour: [] for colour in COLOURS}
+    for (tier, name), card_id in zip(flat, ids):
+        result[EXTRA_TIER_COLOURS[tier]].append((card_id or "00000000", name))
+    return result
+
+
+def stage_restrictions(ctx):
+    """Card name -> restriction number from Banlist.txt."""
+    return parse_banlist(ctx.inputs["banlist"])
+
+
+def stage_merge(ctx, resolve_lists, pool_white, extra_deck, restrictions):
+    """
+    Combine everything into the final colour lists of (id, restriction, name).
+    Extra deck monsters are only added if no card of the same name is listed yet;
+    every one left unresolved keeps its own 00000000 entry.
+    A card in several colours keeps only the first by precedence (red > blue > white);
+    the partition is returned under "partition" for the conflicts report.
+    """
+    merged = {}
+    for colour in COLOURS:
+        # ID -> (ID, name); placeholders are keyed by their name so none of them is dropped
+        entries = {}
+        base = resolve_lists[colour] + (pool_white["cards"] if colour == "white" else [])
+        for card_id, name in base:
+            entries.setdefault(card_id, (card_id, name))
+        names = {name_key(name) for _, name in entries.values()}
+        for card_id, name in extra_deck[colour]:
+            key = name_key(name)
+            if key not in names:
+                entries.setdefault(card_id if int(card_id) else key, (card_id, name))
+                names.add(key)
+        merged[colour] = list(entries.values())
+
+    partition = ColourPartition({colour: [card_id for card_id, _ in entries] for colour, entries in merged.items()})
+    restrictions = NameIndex(restrictions)
+    result = {"partition": partition}
+    for colour, entries in merged.items():
+        removed = partition.removed(colour)
+        result[colour] = [(card_id, restrictions.get(name, "3"), name) for card_id, name in entries
+                          if int(card_id) not in removed]
+    return result
+
+
+def stage_conflicts(ctx, merge):
+    """Write the cards listed in more than one colour to colour_conflicts.txt in the output directory."""
+    names = {card_id: name for colour in COLOURS for card_id, _, name in merge[colour]}
+    path = os.path.join(ctx.out_dir, CONFLICTS_FILE)
+    os.makedirs(ctx.out_dir, exist_ok=True)
+    conflicts = merge["partition"].write_report(path, names)
+    if conflicts:
+        logging.warning(f"{conflicts} cards are listed in more than one colour; see {CONFLICTS_FILE}.")
+    return {path: file_hash(path)}
+
+
+def pool_cards(merge, extra_deck):
+    """Yield (card_id, colour, restriction, extra_deck, name) for every merged entry."""
+    extra_names = {name_key(name) for colour in COLOURS for _, name in extra_deck[colour]}
+    for colour in COLOURS:
+        for card_id, restriction, name in merge[colour]:
+            yield card_id, colour, restriction, name_key(name) in extra_names, name
+
+
+def stage_write_confs(ctx, merge, extra_deck):
+    """Write every banlist variant in one pass, skipping any that are already byte-identical."""
+    return export_variants(pool_cards(merge, extra_deck), ctx.out_dir)
+
+
+def stage_snapshot(ctx, merge, extra_deck, write_confs):
+    """Compile the merged pool into a memory-mappable snapshot next to the .conf files."""
+    cards = (card for card in pool_cards(merge, extra_deck) if int(card[0]))
+    path = os.path.join(ctx.out_dir, SNAPSHOT_FILE)
+    count = write_snapshot(path, cards, source_digest(sorted(write_confs)))
+    logging.info(f"Wrote a snapshot of {count} cards to {path}.")
+    return {path: file_hash(path)}
+
+
+def stage_history(ctx, merge, extra_deck, write_confs):
+    """Record the merged pool as a revision in build/history, unless it is the same as the latest one."""
+    history = PoolHistory(os.path.join(ctx.out_dir, HISTORY_DIR))
+    before = len(history)
+    number = history.record(card for card in pool_cards(merge, extra_deck) if int(card[0]))
+    if number != before:
+        logging.info(f"Recorded pool revision {number} (new columns: "
+                     f"{', '.join(history.revisions[-1]['new_columns']) or 'none'}).")
+    return number
+
+
+def stage_validate(ctx, merge):
+    """Check the merged lists against the databases and write the unmatched entries next to the .conf files."""
+    report = validate_entries({colour: merge[colour] for colour in COLOURS}, ctx.cdb_files)
+    report.log()
+    os.makedirs(ctx.out_dir, exist_ok=True)
+    report.write_unmatched(os.path.join(ctx.out_dir, UNMATCHED_FILE))
+    return report.ok
+
+
+def stage_pool_cdb(ctx, merge, validate):
+    """Build build/pool.cdb from the given databases, holding only the pool's cards with their OT set."""
+    if not validate and not ctx.skip_validation:
+        logging.error(f"Not building {POOL_CDB_FILE}: the lists failed validation (use --skip-validation).")
+        return None
+    ids = {colour: {card_id for card_id, _, _ in merge[colour]} for colour in COLOURS}
+    path = os.path.join(ctx.out_dir, POOL_CDB_FILE)
+    build_pool_cdb(ctx.cdb_files, ids["red"], ids["blue"], ids["white"], path)
+    return {path: file_hash(path)}
+
+
+def stage_relabel(ctx, merge, validate):
+    """Relabel the OT field of the given EDOPro databases (incrementally, via the manifest)."""
+    if not validate and not ctx.skip_validation:
+        logging.error("Not relabelling: the lists failed validation (use --skip-validation to relabel anyway).")
+        return False
+    ids = {colour: {card_id for card_id, _, _ in merge[colour]} for colour in COLOURS}
+    manifest = Manifest(os.path.join(ctx.out_dir, MANIFEST_FILE))
+    return relabel_databases(ctx.cdb_files, ids["red"], ids["blue"], ids["white"],
+                             dry_run=ctx.dry_run, manifest=manifest)
+
+
+STAGES = [
+    Stage("resolve_lists", stage_resolve_lists, inputs=("red_names", "blue_names", "white_names"),
+          params=Context.resolver_state),
+    Stage("pool_white", stage_pool_white, deps=("resolve_lists",), inputs=("all_cards",), version=3,
+          params=Context.resolver_state),
+    Stage("extra_deck", stage_extra_deck, inputs=("banlist_extra",),
+          params=Context.resolver_state),
+    Stage("restrictions", stage_restrictions, inputs=("banlist",)),
+    Stage("merge", stage_merge, deps=("resolve_lists", "pool_white", "extra_deck", "restrictions"), version=3),
+    Stage("conflicts", stage_conflicts, deps=("merge",), params=lambda ctx: ctx.out_dir, outputs=True),
+    Stage("write_confs", stage_write_confs, deps=("merge", "extra_deck"), params=lambda ctx: ctx.out_dir,
+          version=3, outputs=True),
+    Stage("snapshot", stage_snapshot, deps=("merge", "extra_deck", "write_confs"), outputs=True),
+    Stage("history", stage_history, deps=("merge", "extra_deck", "write_confs"), cache=False),
+    Stage("validate", stage_validate, deps=("merge",), cache=False),
+    Stage("pool_cdb", stage_pool_cdb, deps=("merge", "validate"), cache=False),
+    Stage("relabel", stage_relabel, deps=("merge", "validate"), cache=False),
+]
+
+
+class Pipeline:
+    """Runs a list of stages as a DAG with make-style caching."""
+
+    def __init__(self, stages, ctx, cache_dir=CACHE_DIR, force=False, workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.ctx = ctx
+        self.cache_dir = cache_dir
+        self.force = force
+        self.workers = workers
+        self.keys = {}
+        for stage in stages:  # Stages are listed in dependency order
+            self.keys[stage.name] = self._key(stage)
+
+    def _key(self, stage):
+        material = {
+            "stage": stage.name,
+            "version": stage.version,
+            "inputs": {name: file_hash(self.ctx.inputs[name]) for name in stage.inputs},
+            "params": stage.params(self.ctx),
+            "deps": [self.keys[dep] for dep in stage.deps],
+            # Nearly every stage joins names through name_key()
+            "aliases": file_hash(ALIASES_FILE),
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}-{self.keys[name][:16]}.pickle")
+
+    def _load_cached(self, name):
+        """Return (True, result) if a valid cached result exists, else (False, None)."""
+        stage = self.stages[name]
+        path = self._cache_path(name)
+        if self.force or not stage.cache or not os.path.exists(path):
+            return False, None
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+        if stage.outputs and any(file_hash(out) != digest for out, digest in result.items()):
+            return False, None
+        return True, result
+
+    def _store(self, name, result):
+        if not self.stages[name].cache:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        # Results for older inputs will never be asked for again
+        for filename in os.listdir(self.cache_dir):
+            stale = os.path.join(self.cache_dir, filename)
+            if filename.startswith(f"{name}-") and filename.endswith(".pickle") and stale != path:
+                os.remove(stale)
+
+    def _plan(self, targets):
+        """
+        Work out which stages must run and which cached results must be loaded.
+        A cached stage is only loaded if it is a target or a stage that runs needs its result.
+        """
+        to_run, to_load, cached = [], set(), {}
+
+        def visit(name):
+            if name in to_run or name in cached:
+                return
+            hit, result = self._load_cached(name)
+            if hit:
+                cached[name] = result
+                return
+            for dep in self.stages[name].deps:
+                visit(dep)
+            to_run.append(name)
+
+        for name in targets:
+            visit(name)
+        to_load.update(name for name in targets if name in cached)
+        for name in to_run:
+            to_load.update(dep for dep in self.stages[name].deps if dep in cached)
+        return to_run, {name: cached[name] for name in to_load}, set(cached) - to_load
+
+    def run(self, targets):
+        to_run, results, skipped = self._plan(targets)
+        for name in sorted(skipped | set(results)):
+            logging.info(f"[{name}] unchanged, using cached result.")
+            metrics.count("pipeline_stages_total", stage=name, result="cached")
+
+        pending = list(to_run)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    if all(dep in results for dep in stage.deps):
+                        pending.remove(name)
+                        dep_results = {dep: results[dep] for dep in stage.deps}
+                        running[pool.submit(self._run_stage, stage, dep_results)] = name
+                if not running:
+                    raise RuntimeError(f"Unsatisfiable stages: {pending}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+        return results
+
+    def _run_stage(self, stage, dep_results):
+        start = time.perf_counter()
+        logging.info(f"[{stage.name}] running...")
+        result = stage.func(self.ctx, **dep_results)
+        self._store(stage.name, result)
+        elapsed = time.perf_counter() - start
+        logging.info(f"[{stage.name}] done in {elapsed:.2f} s.")
+        metrics.count("pipeline_stages_total", stage=stage.name, result="run")
+        metrics.observe("stage_seconds", elapsed, stage=stage.name)
+        return result
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Run the whole DMVR card list pipeline.")
+    parser.add_argument("--out", default=os.path.join(REPO_ROOT, "build"),
+                        help="directory for the generated .conf files (default: build/)")
+    parser.add_argument("--cdb", nargs="*", default=[], metavar="CDB",
+                        help="EDOPro databases whose OT field should be relabelled")
+    parser.add_argument("--offline", metavar="DUMP",
+                        help="resolve names against a local card dump (cardinfo.php JSON or cardData.json)")
+    parser.add_argument("--dry-run", action="store_true", help="report database changes without writing them")
+    parser.add_argument("--pool-cdb", action="store_true",
+                        help=f"build {POOL_CDB_FILE} with only the pool's cards instead of relabelling --cdb")
+    parser.add_argument("--skip-validation", action="store_true",
+                        help="relabel even if the lists fail validation against the databases")
+    parser.add_argument("--force", action="store_true", help="ignore cached stage results")
+    for name, default in DEFAULT_INPUTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default=os.path.join(REPO_ROOT, default),
+                            help=f"(default: {default})")
+    args = parser.parse_args()
+
+    if args.offline:
+        use_card_dump(args.offline)
+
+    inputs = {name: getattr(args, name) for name in DEFAULT_INPUTS}
+    ctx = Context(inputs, args.out, args.cdb, args.offline, args.dry_run, args.skip_validation)
+    # The resolving stages are targets too, so their unresolved names are reported on cached runs
+    targets = ["resolve_lists", "pool_white", "extra_deck", "write_confs", "conflicts", "snapshot", "history"]
+    if args.cdb:
+        targets.append("pool_cdb" if args.pool_cdb else "relabel")
+    results = Pipeline(STAGES, ctx, force=args.force).run(targets)
+
+    not_found = [name for stage in ("resolve_lists", "pool_white") for name in results[stage]["not_found"]]
+    not_found += [name for colour in COLOURS for card_id, name in results["extra_deck"][colour] if not int(card_id)]
+    if not_found:
+        logging.warning(f"{len(not_found)} listed cards were not found: {', '.join(not_found)}")
+    if results.get("relabel") is False or (args.pool_cdb and args.cdb and results.get("pool_cdb") is None):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
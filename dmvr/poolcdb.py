@@ -0,0 +1,96 @@
+import logging
+import os
+import sqlite3
+import time
+
+from dmvr import metrics
+from dmvr.relabel import load_pool_table, target_ots
+
+POOL_CDB_FILE = "pool.cdb"
+
+CARD_TABLES = ("datas", "texts")
+
+
+def table_columns(conn, schema, table):
+    """(column names, True if id is the primary key) of schema.table."""
+    info = conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()
+    return [row[1] for row in info], any(row[1] == "id" and row[5] for row in info)
+
+
+@metrics.timed("call_seconds", function="build_pool_cdb")
+def build_pool_cdb(database_paths, red_card_ids, blue_card_ids, white_card_ids, out_path=POOL_CDB_FILE):
+    """
+    Build a new database holding only the pool's cards, with their OT already set,
+    instead of relabelling every row of the full databases. The datas and texts
+    schema is copied from the first database; rows are copied with one
+    INSERT ... SELECT per table and database, in the given order, so the first
+    database that has a card wins. Alternate artworks (alias of a pool card) come
+    along with the OT of their card. The result is VACUUMed and moved into place
+    atomically. Returns the number of cards written.
+    """
+    start = time.perf_counter()
+    database_paths = [path for path in database_paths if os.path.exists(path)]
+    if not database_paths:
+        raise FileNotFoundError("none of the databases exist")
+    targets = target_ots(red_card_ids, blue_card_ids, white_card_ids)
+
+    tmp_path = f"{out_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        cursor = conn.cursor()
+        aliases = [f"src{i}" for i in range(len(database_paths))]
+        for alias, path in zip(aliases, database_paths):
+            cursor.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        for table in CARD_TABLES:
+            sql = cursor.execute(f"SELECT sql FROM {aliases[0]}.sqlite_master WHERE type = 'table' AND name = ?",
+                                 (table,)).fetchone()
+            if sql is None:
+                raise sqlite3.OperationalError(f"{database_paths[0]} has no {table} table")
+            cursor.execute(sql[0])
+        load_pool_table(cursor, targets)
+
+        # Every listed card plus the alternate artworks of listed cards, with the OT of the listed card
+        cursor.execute("CREATE TEMP TABLE wanted (id INTEGER PRIMARY KEY, ot INTEGER NOT NULL)")
+        cursor.execute("INSERT INTO temp.wanted SELECT id, ot FROM temp.pool")
+        for alias in aliases:
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO temp.wanted
+                SELECT d.id, p.ot FROM {alias}.datas d JOIN temp.pool p ON p.id = d.alias
+            """)
+
+        datas_columns, datas_keyed = table_columns(conn, "main", "datas")
+        texts_columns, texts_keyed = table_columns(conn, "main", "texts")
+        # EDOPro keys both tables by id; the index makes INSERT OR IGNORE keep the first database's row otherwise too
+        if not datas_keyed:
+            cursor.execute("CREATE UNIQUE INDEX datas_id ON datas (id)")
+        if not texts_keyed:
+            cursor.execute("CREATE UNIQUE INDEX texts_id ON texts (id)")
+        select_datas = ", ".join("w.ot" if column == "ot" else f"d.{column}" for column in datas_columns)
+        select_texts = ", ".join(f"t.{column}" for column in texts_columns)
+        for alias in aliases:
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO datas ({", ".join(datas_columns)})
+                SELECT {select_datas} FROM {alias}.datas d JOIN temp.wanted w ON w.id = d.id
+            """)
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO texts ({", ".join(texts_columns)})
+                SELECT {select_texts} FROM {alias}.texts t JOIN main.datas d ON d.id = t.id
+            """)
+        count = cursor.execute("SELECT COUNT(*) FROM datas").fetchone()[0]
+        conn.commit()
+        for alias in aliases:
+            cursor.execute(f"DETACH DATABASE {alias}")
+        cursor.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, out_path)
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"Wrote {count} cards to {out_path} ({os.path.getsize(out_path) / 1024:.0f} KiB) "
+                 f"in {elapsed * 1000:.1f} ms.")
+    return count
@@ -0,0 +1,199 @@
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dmvr import metrics
+from dmvr.manifest import diff_states
+from dmvr.partition import DEFAULT_PRECEDENCE, ColourPartition
+
+# OT values written for each list
+OT_RED = 8        # ILLEGAL
+OT_BLUE = 2       # TCG
+OT_WHITE = 32     # CUSTOM
+OT_HIDDEN = 4096  # Unlisted cards
+
+OT_LABELS = {
+    OT_RED: "RED cards to ILLEGAL (8)",
+    OT_BLUE: "BLUE cards to TCG (2)",
+    OT_WHITE: "WHITE cards to CUSTOM (32)",
+    OT_HIDDEN: "unlisted cards to OT = 4096",
+}
+
+
+COLOUR_OTS = {"red": OT_RED, "blue": OT_BLUE, "white": OT_WHITE}
+
+
+def target_ots(red_card_ids, blue_card_ids, white_card_ids, precedence=DEFAULT_PRECEDENCE):
+    """Returns {card ID: OT} for every listed card; a card in several lists gets the OT of the first in precedence."""
+    lists = {"red": red_card_ids, "blue": blue_card_ids, "white": white_card_ids}
+    partition = ColourPartition(lists, precedence=precedence)
+    return {str(card_id): COLOUR_OTS[colour] for card_id, colour in partition.targets().items()}
+
+
+def load_pool_table(cursor, targets, only_ids=None):
+    """
+    Loads the target OT of every listed ID into a temporary table keyed by ID.
+    If only_ids is given, those IDs also go into temp.scope to restrict the update.
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS pool (id INTEGER PRIMARY KEY, ot INTEGER NOT NULL)")
+    cursor.execute("DELETE FROM temp.pool")
+    cursor.executemany("INSERT INTO temp.pool (id, ot) VALUES (?, ?)",
+                       ((int(card_id), ot) for card_id, ot in targets.items()))
+    if only_ids is not None:
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS scope (id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.scope")
+        cursor.executemany("INSERT INTO temp.scope (id) VALUES (?)", ((int(card_id),) for card_id in only_ids))
+
+
+def count_pending_changes(cursor, scoped=False):
+    """Returns {target OT: number of rows whose OT would change}."""
+    scope = "AND d.id IN (SELECT id FROM temp.scope)" if scoped else ""
+    cursor.execute(f"""
+        SELECT COALESCE(p.ot, {OT_HIDDEN}) AS target, COUNT(*)
+        FROM datas d LEFT JOIN temp.pool p ON p.id = d.id
+        WHERE d.ot IS NOT COALESCE(p.ot, {OT_HIDDEN}) {scope}
+        GROUP BY target
+    """)
+    return dict(cursor.fetchall())
+
+
+def relabel_database(db_path, targets, only_ids=None, dry_run=False):
+    """
+    Applies every OT value to one database in a single transaction. Returns the per-OT change counts.
+    With only_ids, just those rows are considered (incremental mode).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        load_pool_table(cursor, targets, only_ids)
+        scoped = only_ids is not None
+        changes = count_pending_changes(cursor, scoped)
+
+        if not dry_run:
+            # Every row gets its list's OT, or 4096 if unlisted; rows already correct are left alone
+            scope = "AND id IN (SELECT id FROM temp.scope)" if scoped else ""
+            cursor.execute(f"""
+                UPDATE datas
+                SET ot = COALESCE((SELECT p.ot FROM temp.pool p WHERE p.id = datas.id), {OT_HIDDEN})
+                WHERE ot IS NOT COALESCE((SELECT p.ot FROM temp.pool p WHERE p.id = datas.id), {OT_HIDDEN})
+                {scope}
+            """)
+            conn.commit()
+        return changes
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def relabel_worker(db_path, targets, only_ids, dry_run):
+    """
+    Relabels a temporary copy of one database (or the database itself, read-only, on a dry run).
+    Returns (path of the relabelled copy or None, per-OT change counts, seconds taken).
+    """
+    start = time.perf_counter()
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path} not found")
+    if dry_run:
+        changes = relabel_database(db_path, targets, only_ids, dry_run=True)
+        return None, changes, time.perf_counter() - start
+
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(db_path) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    try:
+        shutil.copy2(db_path, tmp_path)
+        changes = relabel_database(tmp_path, targets, only_ids)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, changes, time.perf_counter() - start
+
+
+def remove_copies(futures):
+    """
+    Delete the temporary copies left by finished relabel_worker() futures: every copy on
+    failure, whatever the error, and none once they have been swapped into place.
+    """
+    for future in futures:
+        if future.cancelled() or future.exception() is not None:
+            continue
+        tmp_path = future.result()[0]
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@metrics.timed("call_seconds", function="relabel_databases")
+def relabel_databases(database_paths, red_card_ids, blue_card_ids, white_card_ids, dry_run=False,
+                      manifest=None, manifest_inputs=(), check=None):
+    """
+    Relabels the OT field of every database from the three colour ID sets.
+    Each database is relabelled in its own process on a temporary copy; the copies
+    replace the originals only once every database has succeeded.
+    With a manifest, only cards whose colour changed since the last applied run are
+    touched (as long as the databases themselves are unchanged); the new state is
+    recorded together with the hashes of manifest_inputs and the databases.
+    check, if given, is called while the workers run (and on its own when an incremental run has
+    nothing to relabel); if it returns False the copies are discarded. Copies are never left behind.
+    """
+    targets = target_ots(red_card_ids, blue_card_ids, white_card_ids)
+    only_ids = None
+    if manifest and manifest.inputs_unchanged("cdb", database_paths):
+        # The databases are as we left them, so only cards that moved need touching
+        only_ids = list(diff_states(manifest.cards("cdb"), targets))
+        logging.info(f"Incremental run: {len(only_ids)} cards changed colour since the last run.")
+        if not only_ids:
+            # Nothing to relabel, but the lists are still checked
+            return check is None or check()
+
+    start = time.perf_counter()
+    results = {}
+    futures = {}
+    try:
+        failed = False
+        with ProcessPoolExecutor(max_workers=len(database_paths)) as pool:
+            for db_path in database_paths:
+                futures[db_path] = pool.submit(relabel_worker, db_path, targets, only_ids, dry_run)
+            if check is not None and not check():
+                failed = True
+            for db_path, future in futures.items():
+                try:
+                    results[db_path] = future.result()
+                except (sqlite3.Error, OSError) as e:
+                    logging.error(f"Database error in {db_path}: {e}")
+                    failed = True
+
+        if failed:
+            logging.error("Aborting: no database was changed.")
+            return False
+
+        verb = "Would update" if dry_run else "Updated"
+        # The workers run in other processes, so their numbers are recorded here
+        counter = "ot_rows_pending_total" if dry_run else "ot_rows_updated_total"
+        for db_path, (tmp_path, changes, elapsed) in results.items():
+            database = os.path.basename(db_path)
+            for ot, label in OT_LABELS.items():
+                logging.info(f"{verb} {changes.get(ot, 0)} {label} in {db_path}.")
+                metrics.count(counter, changes.get(ot, 0), database=database, ot=ot)
+            logging.info(f"Relabelled {db_path} in {elapsed * 1000:.1f} ms.")
+            metrics.observe("relabel_database_seconds", elapsed, database=database)
+
+        if dry_run:
+            logging.info("Dry run: no database was changed.")
+            return True
+
+        # Every copy is ready; swap them all into place
+        for db_path, (tmp_path, _, _) in results.items():
+            os.replace(tmp_path, db_path)
+    finally:
+        remove_copies(futures.values())
+    if manifest:
+        manifest.record("cdb", list(manifest_inputs) + list(database_paths), targets)
+        manifest.save()
+    logging.info(f"Database update complete for {len(results)} databases in {(time.perf_counter() - start) * 1000:.1f} ms!")
+    return True
@@ -0,0 +1,303 @@
+import os
+import sqlite3
+import threading
+import time
+
+from dmvr import metrics
+from dmvr.cdb import CdbNameIndex
+from dmvr.fetch import LOOKUP_FAILED, YGOPRODECK_URL, YgoprodeckClient
+from dmvr.fuzzy import FuzzyNameIndex
+from dmvr.names import clean_card_name, name_key
+
+# Database files in precedence order (adjust paths as needed)
+EXPANSIONS_DIR = os.environ.get("DMVR_EXPANSIONS_DIR", "/home/soeren/.local/opt/edopro/app/expansions")
+IGNIS_DB_FILES = [
+    os.path.join(EXPANSIONS_DIR, "cards.cdb"),
+    os.path.join(EXPANSIONS_DIR, "cards-unofficial.cdb"),
+]
+
+# Persistent name -> ID cache shared by every script
+CACHE_FILE = os.environ.get(
+    "DMVR_CACHE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "card_ids.sqlite"),
+)
+POSITIVE_TTL = 90 * 24 * 3600  # Card IDs almost never change
+NEGATIVE_TTL = 24 * 3600       # Retry unknown names once a day
+
+# Where a cached ID came from
+SOURCE_API_EXACT = "api-exact"
+SOURCE_API_FUZZY = "api-fuzzy"
+SOURCE_IGNIS = "ignis"
+SOURCE_DUMP = "dump"
+SOURCE_FUZZY_LOCAL = "fuzzy-local"  # No longer written; entries from older runs are ignored
+SOURCE_NOT_FOUND = "not-found"
+SOURCE_CACHE = "cache"  # Only used to label metrics
+
+# Point this at a local stub server to test without hitting the real API
+API_URL = os.environ.get("DMVR_YGOPRODECK_URL", YGOPRODECK_URL)
+
+
+class CardIdCache:
+    """SQLite-backed cache of resolved card IDs, including negative results."""
+
+    def __init__(self, path=CACHE_FILE, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Shared by the pipeline's worker threads, so access is serialised with a lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS card_ids (
+                name       TEXT PRIMARY KEY,
+                card_id    TEXT,
+                source     TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, name):
+        """Return (card_id, source) for a fresh entry, or None on a miss or expired entry."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT card_id, source, fetched_at FROM card_ids WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            metrics.count("cache_requests_total", result="miss")
+            return None
+        card_id, source, fetched_at = row
+        if source == SOURCE_FUZZY_LOCAL:  # Fuzzy matches used to be accepted; they are not trusted any more
+            metrics.count("cache_requests_total", result="miss")
+            return None
+        ttl = self.negative_ttl if card_id is None else self.positive_ttl
+        if time.time() - fetched_at > ttl:
+            metrics.count("cache_requests_total", result="expired")
+            return None
+        metrics.count("cache_requests_total", result="hit")
+        return card_id, source
+
+    def put(self, name, card_id, source):
+        """Store a lookup result; card_id is None for names that could not be resolved."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO card_ids (name, card_id, source, fetched_at) VALUES (?, ?, ?, ?)",
+                (name, card_id, source, time.time()),
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+_default_cache = None
+_default_client = None
+_ignis_index = None
+_fuzzy_index = None
+_offline_index = None
+_offline_cards = None
+_init_lock = threading.RLock()
+
+
+def get_cache():
+    """Return the process-wide cache, opening it on first use."""
+    global _default_cache
+    with _init_lock:
+        if _default_cache is None:
+            _default_cache = CardIdCache()
+    return _default_cache
+
+
+def get_client():
+    """Return the process-wide YGOPRODeck client, creating it on first use."""
+    global _default_client
+    with _init_lock:
+        if _default_client is None:
+            _default_client = YgoprodeckClient(API_URL)
+    return _default_client
+
+
+def use_card_dump(dump_file):
+    """
+    Switch to offline mode: resolve names against a local full card dump
+    (cardinfo.php response or cardData.json) instead of the YGOPRODeck API.
+    """
+    global _offline_index, _offline_cards, _fuzzy_index
+    from dmvr.carddump import build_name_index, load_card_index
+
+    _offline_cards = load_card_index(dump_file)
+    _offline_index = build_name_index(_offline_cards)
+    _fuzzy_index = None
+    print(f"Loaded {len(_offline_index)} card names from '{dump_file}' (offline mode).")
+    return _offline_index
+
+
+def use_client(client=None, cache=None):
+    """
+    Replace the process-wide YGOPRODeck client and/or cache, e.g. with a client
+    pointed at a local stub server and a throwaway cache for benchmarking.
+    """
+    global _default_client, _default_cache
+    with _init_lock:
+        if client is not None:
+            _default_client = client
+        if cache is not None:
+            _default_cache = cache
+
+
+def get_card_id_from_dump(card_name):
+    """Look the card up in the offline dump index, if one is loaded."""
+    if _offline_index is None:
+        return None
+    return _offline_index.get(name_key(card_name))
+
+
+def get_card_id_from_ygoprodeck(card_name):
+    """
+    Query the YGOPRODeck API, first by exact name and then by fuzzy 'fname' search.
+    Returns (card_id, source), (None, None) or (None, LOOKUP_FAILED).
+    """
+    card_id, param = get_client().lookup(clean_card_name(card_name))
+    if card_id is None:
+        return None, param
+    return card_id, SOURCE_API_EXACT if param == "name" else SOURCE_API_FUZZY
+
+
+def get_ignis_index():
+    """Return the name index over the Ignis databases, loading it on first use."""
+    global _ignis_index
+    with _init_lock:
+        if _ignis_index is None:
+            _ignis_index = CdbNameIndex(IGNIS_DB_FILES)
+    return _ignis_index
+
+
+def get_card_id_from_ignis(card_name):
+    """Look the card up by name in the Project Ignis databases."""
+    return get_ignis_index().get_id(clean_card_name(card_name))
+
+
+def get_fuzzy_index():
+    """Return the approximate-match index over every locally known name, used for suggestions only."""
+    global _fuzzy_index
+    with _init_lock:
+        if _fuzzy_index is None:
+            _fuzzy_index = FuzzyNameIndex(get_ignis_index().by_name)
+            if _offline_cards is not None:
+                # The dump's own spelling, not the name_key() of the offline index, is what suggestions show
+                _fuzzy_index.add_many(zip(_offline_cards.names, _offline_cards.ids))
+    return _fuzzy_index
+
+
+def suggest_names(card_name):
+    """Local names close to one that could not be resolved, as (name, card_id, score); never used as a match."""
+    return get_fuzzy_index().suggest(clean_card_name(card_name))
+
+
+def report_not_found(card_name):
+    """Print an unresolved name, with the closest local names as suggestions."""
+    suggestions = ", ".join(f"'{name}' ({card_id})" for name, card_id, _ in suggest_names(card_name))
+    if suggestions:
+        print(f"Card ID not found for: '{card_name}' (did you mean {suggestions}?)")
+    else:
+        print(f"Card ID not found for: '{card_name}'")
+
+
+def report_lookup_failed(card_name):
+    """Print a name that could not be resolved because YGOPRODeck was unreachable; no suggestions are looked up."""
+    print(f"Card ID not resolved for: '{card_name}' (YGOPRODeck could not be reached; it will be retried next run)")
+
+
+def get_card_id_locally(card_name):
+    """Resolve a name without the network: dump, then Ignis databases. Only exact (name_key) hits count."""
+    card_id = get_card_id_from_dump(card_name)
+    if card_id is not None:
+        return card_id, SOURCE_DUMP
+    card_id = get_card_id_from_ignis(card_name)
+    if card_id is not None:
+        return card_id, SOURCE_IGNIS
+    return None, None
+
+
+def get_card_id(card_name, cache=None):
+    """
+    Resolve a card name to its ID.
+    In offline mode only local sources (dump, Ignis databases) are used.
+    Otherwise the persistent cache is consulted first; a miss is resolved locally,
+    then via YGOPRODeck, and the outcome is written back to the cache.
+    """
+    if _offline_index is not None:
+        card_id, source = get_card_id_locally(card_name)
+        metrics.count("card_lookups_total", source=source or SOURCE_NOT_FOUND)
+        if card_id is None:
+            report_not_found(card_name)
+        return card_id
+
+    cache = cache or get_cache()
+    key = clean_card_name(card_name)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.count("card_lookups_total", source=SOURCE_CACHE)
+        return cached[0]
+
+    card_id, source = get_card_id_locally(card_name)
+    if card_id is None:
+        card_id, source = get_card_id_from_ygoprodeck(card_name)
+    metrics.count("card_lookups_total", source=source or SOURCE_NOT_FOUND)
+    if source == LOOKUP_FAILED:  # Don't remember network failures as "not found"
+        report_lookup_failed(card_name)
+        return None
+    cache.put(key, card_id, source or SOURCE_NOT_FOUND)
+
+    if card_id is None:
+        report_not_found(card_name)
+    return card_id
+
+
+def resolve_many(card_names, cache=None):
+    """
+    Resolve a list of card names at once and return their IDs in the same order.
+    Cache hits and locally resolvable names are answered first; the remaining
+    unique names are looked up concurrently through the rate-limited client.
+    """
+    if _offline_index is not None:
+        return [get_card_id(name) for name in card_names]
+
+    cache = cache or get_cache()
+    keys = [clean_card_name(name) for name in card_names]
+    resolved = {}
+    pending = []
+    for key in dict.fromkeys(keys):
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.count("card_lookups_total", source=SOURCE_CACHE)
+            resolved[key] = cached[0]
+            continue
+        card_id, source = get_card_id_locally(key)
+        if card_id is not None:
+            metrics.count("card_lookups_total", source=source)
+            cache.put(key, card_id, source)
+            resolved[key] = card_id
+        else:
+            pending.append(key)
+
+    if pending:
+        print(f"Resolving {len(pending)} card names via YGOPRODeck ({len(resolved)} resolved locally)...")
+        results = get_client().lookup_many(pending)
+        for key, (card_id, param) in zip(pending, results):
+            resolved[key] = card_id
+            if param == LOOKUP_FAILED:
+                metrics.count("card_lookups_total", source=LOOKUP_FAILED)
+                report_lookup_failed(key)
+                continue
+            if card_id is not None:
+                source = SOURCE_API_EXACT if param == "name" else SOURCE_API_FUZZY
+            else:
+                source = SOURCE_NOT_FOUND
+                report_not_found(key)
+            metrics.count("card_lookups_total", source=source)
+            cache.put(key, card_id, source)
+
+    return [resolved[key] for key in keys]
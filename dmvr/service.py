@@ -0,0 +1,237 @@
+"""
+Read-only HTTP/JSON lookups against the merged card pool:
+
+    python -m dmvr.service [--port 8080] [--red OnlyRedCards.conf ...] [--banlist Banlist.txt]
+
+    GET  /card/<id>                     one card by ID
+    GET  /card?name=<name>              one card by name (case and suffix insensitive)
+    GET  /cards?id=<id>&name=<name>...  several cards at once
+    POST /cards {"ids": [...], "names": [...]}
+    GET  /health                        card count and when the lists were loaded
+
+The lists are watched and reloaded in the background when they change; requests
+keep being answered from the previous index until the new one is complete.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from dmvr.banlist import BANLIST_MAPPING, parse_banlist
+from dmvr.conf import iter_entries
+from dmvr.names import NameIndex, name_key
+from dmvr.partition import DEFAULT_PRECEDENCE
+
+RESTRICTION_NAMES = {int(number): name for name, number in BANLIST_MAPPING.items()}
+MAX_BATCH = 10000
+
+INVALID_ID = {"error": "card IDs must be integers or digit strings"}
+
+
+def parse_card_id(card_id):
+    """The card ID as an int, or None unless it is an int (not a bool) or a string of digits."""
+    if isinstance(card_id, int) and not isinstance(card_id, bool):
+        return card_id
+    if isinstance(card_id, str) and card_id.isascii() and card_id.isdigit():
+        return int(card_id)
+    return None
+
+
+class PoolIndex:
+    """
+    Immutable ID and name indexes over the colour lists and Banlist.txt.
+    A card listed in several colours keeps the first in precedence order; the
+    restriction comes from Banlist.txt when it lists the card, else from the .conf line.
+    """
+
+    def __init__(self, conf_files, banlist_file=None, precedence=DEFAULT_PRECEDENCE):
+        self.sources = [path for path in list(conf_files.values()) + [banlist_file] if path]
+        self.stamps = source_stamps(self.sources)
+        self.loaded_at = time.time()
+        banlist = NameIndex(parse_banlist(banlist_file) if banlist_file and os.path.exists(banlist_file) else {})
+        self.by_id = {}
+        self.by_name = {}
+        for colour in precedence:
+            path = conf_files.get(colour)
+            if not path or not os.path.exists(path):
+                continue
+            for card_id, restriction, name in iter_entries(path):
+                key = int(card_id)
+                if not key or key in self.by_id:
+                    continue
+                restriction = int(banlist.get(name, restriction))
+                card = {
+                    "id": key,
+                    "name": name,
+                    "colour": colour,
+                    "restriction": restriction,
+                    "status": RESTRICTION_NAMES.get(restriction, "Unlimited"),
+                }
+                self.by_id[key] = card
+                self.by_name.setdefault(name_key(name), card)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def get(self, card_id):
+        return self.by_id.get(parse_card_id(card_id))
+
+    def find(self, name):
+        return self.by_name.get(name_key(name)) if isinstance(name, str) else None
+
+
+def source_stamps(paths):
+    """(mtime, size) of every source file, None for missing ones; cheap enough to poll."""
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return stamps
+
+
+class PoolService:
+    """Holds the current PoolIndex and swaps in a rebuilt one when the source files change."""
+
+    def __init__(self, conf_files, banlist_file=None, reload_interval=2.0):
+        self.conf_files = conf_files
+        self.banlist_file = banlist_file
+        self.reload_interval = reload_interval
+        self.index = PoolIndex(conf_files, banlist_file)
+        self.stopped = threading.Event()
+
+    def reload_if_changed(self):
+        """Rebuild the index if a source changed. Readers see either the old or the new index, never half of one."""
+        if source_stamps(self.index.sources) == self.index.stamps:
+            return False
+        try:
+            index = PoolIndex(self.conf_files, self.banlist_file)
+        except (OSError, ValueError) as e:
+            logging.error(f"Reload failed, still serving the previous lists: {e}")
+            return False
+        self.index = index
+        logging.info(f"Reloaded {len(index)} cards.")
+        return True
+
+    def watch(self):
+        while not self.stopped.wait(self.reload_interval):
+            self.reload_if_changed()
+
+    def lookup(self, ids=(), names=()):
+        """
+        Batch lookup; results keep the request order and are None for unknown cards.
+        IDs that are neither integers nor digit strings get an error entry.
+        """
+        index = self.index
+        return {
+            "ids": [INVALID_ID if parse_card_id(card_id) is None else index.get(card_id) for card_id in ids],
+            "names": [index.find(name) for name in names],
+        }
+
+
+class PoolRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.startswith("/card/"):
+            card_id = unquote(url.path[len("/card/"):])
+            if parse_card_id(card_id) is None:
+                return self.reply(400, INVALID_ID)
+            card = service.index.get(card_id)
+            return self.reply(200, card) if card else self.reply(404, {"error": "card not in the pool"})
+        if url.path == "/card":
+            card = service.index.find(query.get("name", [""])[0])
+            return self.reply(200, card) if card else self.reply(404, {"error": "card not in the pool"})
+        if url.path == "/cards":
+            return self.batch(query.get("id", []), query.get("name", []))
+        if url.path == "/health":
+            index = service.index
+            return self.reply(200, {"cards": len(index), "loaded_at": index.loaded_at, "sources": index.sources})
+        self.reply(404, {"error": "unknown endpoint"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/cards":
+            return self.reply(404, {"error": "unknown endpoint"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be skipped without a length, so the connection is not reused
+            self.close_connection = True
+            return self.reply(400, {"error": "invalid Content-Length"})
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            ids, names = body.get("ids", []), body.get("names", [])
+        except (ValueError, AttributeError):
+            return self.reply(400, {"error": "expected a JSON object with 'ids' and/or 'names' lists"})
+        if not isinstance(ids, list) or not isinstance(names, list):
+            return self.reply(400, {"error": "'ids' and 'names' must be lists"})
+        self.batch(ids, names)
+
+    def batch(self, ids, names):
+        if len(ids) + len(names) > MAX_BATCH:
+            return self.reply(413, {"error": f"at most {MAX_BATCH} cards per request"})
+        self.reply(200, self.server.service.lookup(ids, names))
+
+    def reply(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def serve(service, host="127.0.0.1", port=8080):
+    """Serve until interrupted, reloading the lists in a background thread."""
+    server = ThreadingHTTPServer((host, port), PoolRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    watcher = threading.Thread(target=service.watch, daemon=True)
+    watcher.start()
+    logging.info(f"Serving {len(service.index)} cards on http://{host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stopped.set()
+        server.server_close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Serve read-only card pool lookups over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080)
+    for colour in DEFAULT_PRECEDENCE:
+        parser.add_argument(f"--{colour}", default=f"Only{colour.capitalize()}Cards.conf")
+    parser.add_argument("--banlist", default="Banlist.txt", help="restrictions by card name (default: Banlist.txt)")
+    parser.add_argument("--reload-interval", type=float, default=2.0, help="seconds between checks for changed lists")
+    args = parser.parse_args()
+
+    conf_files = {colour: getattr(args, colour) for colour in DEFAULT_PRECEDENCE}
+    service = PoolService(conf_files, args.banlist, args.reload_interval)
+    if not len(service.index):
+        logging.error(f"No cards loaded from {', '.join(conf_files.values())}; "
+                      "pass the lists with --red/--blue/--white.")
+        raise SystemExit(1)
+    serve(service, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
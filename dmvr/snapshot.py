@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from dmvr.banlist import parse_extra_banlist
+from dmvr.conf import iter_entries
+from dmvr.manifest import file_hash
+from dmvr.names import name_key
+from dmvr.partition import DEFAULT_PRECEDENCE
+
+SNAPSHOT_FILE = "pool.snap"
+
+MAGIC = b"DMVRPOOL"
+VERSION = 2
+# magic, version, card count, name heap size, folded name heap size, source digest; padded to 64 bytes
+HEADER = struct.Struct("<8sIIII32s")
+HEADER_SIZE = 64
+
+COLOUR_CODES = {"red": 1, "blue": 2, "white": 3}
+COLOUR_NAMES = {code: colour for colour, code in COLOUR_CODES.items()}
+FLAG_EXTRA_DECK = 1
+
+PoolCard = namedtuple("PoolCard", ["card_id", "colour", "restriction", "extra_deck", "name"])
+
+# The file is written and mapped in little-endian order
+NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def source_digest(paths):
+    """One digest over the content hashes of the files a snapshot was built from."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{os.path.basename(path)}:{file_hash(path)}\n".encode("utf-8"))
+    return digest.digest()
+
+
+def _u32(values):
+    column = array("I", values)
+    if not NATIVE_LITTLE_ENDIAN:
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_snapshot(path, cards, digest=b""):
+    """
+    Write cards ((card_id, colour, restriction, extra_deck, name) tuples) as a snapshot.
+    Layout after the header, one column after another:
+      ids u32[n] (sorted), name_ends u32[n], folded_ends u32[n], folded_order u32[n],
+      colours u8[n], restrictions u8[n], flags u8[n], name heap, folded name heap.
+    The folded heap holds the names' name_key() in sorted order; folded_order maps
+    each of them back to its record. A card ID that occurs twice keeps its first record.
+    """
+    records = {}
+    for card_id, colour, restriction, extra_deck, name in cards:
+        records.setdefault(int(card_id), (COLOUR_CODES[colour], int(restriction), bool(extra_deck), name))
+    ids = sorted(records)
+
+    names = [records[card_id][3].encode("utf-8") for card_id in ids]
+    folded = sorted((name_key(records[card_id][3]).encode("utf-8"), slot) for slot, card_id in enumerate(ids))
+    name_ends, folded_ends, end = [], [], 0
+    for name in names:
+        end += len(name)
+        name_ends.append(end)
+    end = 0
+    for key, _ in folded:
+        end += len(key)
+        folded_ends.append(end)
+
+    name_heap = b"".join(names)
+    folded_heap = b"".join(key for key, _ in folded)
+    header = HEADER.pack(MAGIC, VERSION, len(ids), len(name_heap), len(folded_heap), digest.ljust(32, b"\0"))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(_u32(ids))
+        f.write(_u32(name_ends))
+        f.write(_u32(folded_ends))
+        f.write(_u32(slot for _, slot in folded))
+        f.write(bytes(records[card_id][0] for card_id in ids))
+        f.write(bytes(records[card_id][1] for card_id in ids))
+        f.write(bytes(FLAG_EXTRA_DECK if records[card_id][2] else 0 for card_id in ids))
+        f.write(name_heap)
+        f.write(folded_heap)
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+class PoolSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot written by write_snapshot().
+    Nothing is parsed on open: ID lookups binary-search the mapped ID column and
+    name lookups binary-search the folded name heap, so every process that opens
+    the same file shares its pages.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, name_size, folded_size, digest = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} DMVR pool snapshot")
+        self.digest = digest
+        self._count = count
+        view = memoryview(self._mmap)
+        offset = HEADER_SIZE
+        columns = []
+        for _ in range(4):
+            columns.append(self._u32_column(view[offset:offset + 4 * count]))
+            offset += 4 * count
+        self.ids, self._name_ends, self._folded_ends, self._folded_order = columns
+        self.colours = view[offset:offset + count]
+        self.restrictions = view[offset + count:offset + 2 * count]
+        self.flags = view[offset + 2 * count:offset + 3 * count]
+        self._name_heap = offset + 3 * count
+        self._folded_heap = self._name_heap + name_size
+        self._views = [view] + columns + [self.colours, self.restrictions, self.flags]
+
+    @staticmethod
+    def _u32_column(view):
+        if NATIVE_LITTLE_ENDIAN:
+            return view.cast("I")
+        column = array("I", view.tobytes())  # Big-endian hosts pay for one copy
+        column.byteswap()
+        return column
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, card_id):
+        return self.slot(card_id) is not None
+
+    def __iter__(self):
+        for slot in range(self._count):
+            yield self.card(slot)
+
+    def slot(self, card_id):
+        """Position of a card ID in the ID column, or None."""
+        card_id = int(card_id)
+        slot = bisect_left(self.ids, card_id)
+        if slot < self._count and self.ids[slot] == card_id:
+            return slot
+        return None
+
+    def name(self, slot):
+        start = self._name_ends[slot - 1] if slot else 0
+        return self._mmap[self._name_heap + start:self._name_heap + self._name_ends[slot]].decode("utf-8")
+
+    def card(self, slot):
+        return PoolCard(self.ids[slot], COLOUR_NAMES[self.colours[slot]], self.restrictions[slot],
+                        bool(self.flags[slot] & FLAG_EXTRA_DECK), self.name(slot))
+
+    def get(self, card_id):
+        """The PoolCard for an ID, or None if the card is not in the pool."""
+        slot = self.slot(card_id)
+        return None if slot is None else self.card(slot)
+
+    def find(self, name):
+        """The PoolCard for a card name (matched by name_key()), or None."""
+        key = name_key(name).encode("utf-8")
+        ends, heap = self._folded_ends, self._folded_heap
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = ends[mid - 1] if mid else 0
+            if self._mmap[heap + start:heap + ends[mid]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            start = ends[lo - 1] if lo else 0
+            if self._mmap[heap + start:heap + ends[lo]] == key:
+                return self.card(self._folded_order[lo])
+        return None
+
+    def is_current(self, source_paths):
+        """True if the snapshot was built from exactly these files' current contents."""
+        return self.digest == source_digest(source_paths)
+
+    def close(self):
+        for view in reversed(self._views):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pool_from_confs(conf_files, extra_banlist=None, precedence=DEFAULT_PRECEDENCE):
+    """
+    Yield (card_id, colour, restriction, extra_deck, name) for the colour .conf files
+    ({colour: path}). Colours are read in precedence order, so a card listed twice keeps
+    the first colour; unresolved 00000000 entries are left out. Extra deck monsters are
+    recognised by name from BanlistExtra.txt.
+    """
+    extra_names = set()
+    if extra_banlist:
+        extra_names = {name_key(name) for names in parse_extra_banlist(extra_banlist).values() for name in names}
+    for colour in precedence:
+        path = conf_files.get(colour)
+        if not path:
+            continue
+        for card_id, restriction, name in iter_entries(path):
+            if int(card_id):
+                yield card_id, colour, restriction, name_key(name) in extra_names, name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a binary snapshot of the merged card pool.")
+    parser.add_argument("--snapshot", default=SNAPSHOT_FILE, help=f"snapshot file (default: {SNAPSHOT_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile the colour .conf lists into a snapshot")
+    for colour in COLOUR_CODES:
+        build.add_argument(f"--{colour}", default=f"Only{colour.capitalize()}Cards.conf")
+    build.add_argument("--banlist-extra", help="BanlistExtra.txt, to flag extra deck monsters")
+    query = commands.add_parser("query", help="look cards up by ID or name")
+    query.add_argument("cards", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        conf_files = {colour: getattr(args, colour) for colour in COLOUR_CODES if os.path.exists(getattr(args, colour))}
+        sources = list(conf_files.values()) + ([args.banlist_extra] if args.banlist_extra else [])
+        count = write_snapshot(args.snapshot, pool_from_confs(conf_files, args.banlist_extra), source_digest(sources))
+        print(f"Wrote {count} cards to {args.snapshot}.")
+        return
+
+    with PoolSnapshot(args.snapshot) as snapshot:
+        for card in args.cards:
+            found = snapshot.get(card) if card.isdigit() else snapshot.find(card)
+            if found is None:
+                print(f"{card}: not in the pool")
+            else:
+                extra = ", extra deck" if found.extra_deck else ""
+                print(f"{found.card_id} {found.name}: {found.colour}, restriction {found.restriction}{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from collections import Counter
+from itertools import chain, compress
+from operator import ne
+
+from dmvr import metrics
+from dmvr.conf import read_entries
+from dmvr.names import name_key
+from dmvr.partition import COLOURS
+
+PLACEHOLDER_ID = 0
+
+
+class ValidationReport:
+    """
+    Problems found in the colour lists. Every entry is (colour, card_id, restriction, name);
+    mismatches also carry the name the databases give the ID. Duplicates bind one ID to
+    different names; repeats list the same card more than once in one colour under one name.
+    Both are (card_id, [(colour, name), ...]).
+    """
+
+    def __init__(self, entries, databases, missing, mismatched, placeholders, duplicates, repeats, seconds):
+        self.entries = entries
+        self.databases = databases
+        self.missing = missing
+        self.mismatched = mismatched
+        self.placeholders = placeholders
+        self.duplicates = duplicates
+        self.repeats = repeats
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        """False if a problem would mislabel cards: placeholders, wrong IDs for a name, or one ID under two names."""
+        return not (self.placeholders or self.mismatched or self.duplicates)
+
+    def unmatched(self):
+        """Entries no database row matches: unknown IDs and 00000000 placeholders."""
+        return self.placeholders + self.missing
+
+    def summary(self):
+        return (f"{self.entries} entries checked against {len(self.databases)} databases in "
+                f"{self.seconds * 1000:.1f} ms: {len(self.missing)} IDs in no database, "
+                f"{len(self.mismatched)} name/ID mismatches, {len(self.placeholders)} placeholder IDs, "
+                f"{len(self.duplicates)} IDs under different names, {len(self.repeats)} repeated IDs")
+
+    def log(self):
+        log = logging.info if self.ok else logging.error
+        log(self.summary() + ".")
+        for colour, card_id, _, name, cdb_name in self.mismatched:
+            logging.warning(f"{colour}: '{name}' is listed as {card_id}, which the databases call '{cdb_name}'.")
+        for colour, _, _, name in self.placeholders:
+            logging.warning(f"{colour}: '{name}' has the placeholder ID 00000000.")
+        for card_id, listings in self.duplicates:
+            where = ", ".join(f"{colour} '{name}'" for colour, name in listings)
+            logging.warning(f"{card_id} is listed under different names: {where}.")
+        for card_id, listings in self.repeats:
+            where = ", ".join(f"{colour} '{name}'" for colour, name in listings)
+            logging.warning(f"{card_id} is listed more than once (harmless): {where}.")
+
+    def write_unmatched(self, path):
+        """Write the unmatched entries as .conf lines, in list order."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            for _, card_id, restriction, name in self.unmatched():
+                f.write(f"{card_id} {restriction} # {name},\n")
+        os.replace(tmp_path, path)
+
+
+def read_cdb_names(database_paths):
+    """
+    {card ID: name} over the texts tables of the databases, each ID named by the first
+    database that has it, and {card ID: [names]} of the later databases that name it differently.
+    """
+    names, other_names = {}, {}
+    for path in database_paths:
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("SELECT id, name FROM texts WHERE name IS NOT NULL")
+            if not names:
+                names.update(rows)
+                continue
+            for card_id, name in rows:
+                if names.setdefault(card_id, name) != name:
+                    other_names.setdefault(card_id, []).append(name)
+        finally:
+            conn.close()
+    return names, other_names
+
+
+def validate_entries(lists, database_paths):
+    """
+    Check the colour lists ({colour: [(card_id, restriction, name), ...]}) against the
+    texts tables of the databases, each read once into a dict. Listed names are compared
+    with the databases' names in bulk; only the entries that differ are looked at one by
+    one, and only IDs listed more than once are checked for duplicates.
+    Databases that do not exist are left out.
+    """
+    start = time.perf_counter()
+    databases = [path for path in database_paths if os.path.exists(path)]
+    names, other_names = read_cdb_names(databases)
+
+    count = 0
+    placeholders, missing, mismatched = [], [], []
+    listed = {}
+    for colour, entries in lists.items():
+        count += len(entries)
+        if not entries:
+            continue
+        ids, restrictions, list_names = zip(*entries)
+        numbers = list(map(int, ids))
+        listed[colour] = (numbers, list_names)
+        if databases:
+            differs = compress(range(len(numbers)), map(ne, map(names.get, numbers), list_names))
+        else:
+            differs = (i for i, number in enumerate(numbers) if number == PLACEHOLDER_ID)
+        for i in differs:
+            number, name = numbers[i], list_names[i]
+            entry = (colour, ids[i], int(restrictions[i]), name)
+            if number == PLACEHOLDER_ID:
+                placeholders.append(entry)
+            elif number not in names:
+                missing.append(entry)
+            else:
+                # A name differing by case or spelling only is fine, in any of the databases
+                key = name_key(name)
+                if all(name_key(cdb_name) != key for cdb_name in [names[number], *other_names.get(number, ())]):
+                    mismatched.append(entry + (names[number],))
+
+    # The same ID bound to different names anywhere, or listed twice in one list under one name.
+    # An ID in several colours under one name is left to the colour precedence.
+    counts = Counter(chain.from_iterable(numbers for numbers, _ in listed.values()))
+    repeated = {number for number, times in counts.items() if times > 1 and number != PLACEHOLDER_ID}
+    listings = {}
+    for colour, (numbers, list_names) in listed.items():
+        for i in compress(range(len(numbers)), map(repeated.__contains__, numbers)):
+            listings.setdefault(numbers[i], []).append((colour, list_names[i]))
+    duplicates, repeats = [], []
+    for card_id, found in sorted(listings.items()):
+        if len({name_key(name) for _, name in found}) > 1:
+            duplicates.append((card_id, found))
+        elif len(found) > len({colour for colour, _ in found}):
+            repeats.append((card_id, found))
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("validate_seconds", elapsed)
+    return ValidationReport(count, databases, missing, mismatched, placeholders, duplicates, repeats, elapsed)
+
+
+def validate_confs(conf_files, database_paths):
+    """Validate the colour .conf files ({colour: path}) against the databases."""
+    lists = {colour: read_entries(path) for colour, path in conf_files.items() if os.path.exists(path)}
+    return validate_entries(lists, database_paths)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Check the colour lists against the EDOPro databases.")
+    parser.add_argument("databases", nargs="*", default=["cards.cdb", "cards-unofficial.cdb", "goat-entries.cdb"])
+    for colour in COLOURS:
+        parser.add_argument(f"--{colour}", default=f"Only{colour.capitalize()}Cards.conf")
+    parser.add_argument("--unmatched", default="unmatched_cards.txt",
+                        help="where to write the entries no database knows (default: unmatched_cards.txt)")
+    args = parser.parse_args()
+
+    report = validate_confs({colour: getattr(args, colour) for colour in COLOURS}, args.databases)
+    report.log()
+    report.write_unmatched(args.unmatched)
+    raise SystemExit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
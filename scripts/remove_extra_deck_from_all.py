@@ -1,38 +1,41 @@
-import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr import metrics
+from dmvr.carddump import load_card_index
+from dmvr.conf import remove_ids
+from dmvr.names import NameIndex
 
 def load_card_data(json_file):
-    """Load the card name-to-ID mapping from cardData.json."""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        card_data = json.load(f)
-    return {card["name"]: card["id"] for card in card_data}
+    """
+    Load the card name-to-ID mapping from cardData.json.
+    The dump is streamed and only IDs and names are kept (see dmvr.carddump).
+    """
+    return NameIndex(load_card_index(json_file).by_name())
 
 def load_extra_deck_names(file_path):
     """Load extra deck card names from a file."""
     with open(file_path, 'r', encoding='utf-8') as f:
         return {line.strip() for line in f if line.strip()}
 
+@metrics.timed("call_seconds", function="filter_file")
 def filter_file(extra_deck_file, card_data_file, target_files):
-    """Remove lines from multiple target files that contain extra deck card IDs."""
+    """Remove the entries for extra deck cards from multiple target .conf files."""
     # Load name-to-ID mapping
     name_to_id = load_card_data(card_data_file)
     
     # Load extra deck card names and find their corresponding IDs
     extra_deck_names = load_extra_deck_names(extra_deck_file)
-    extra_deck_ids = {name_to_id[name] for name in extra_deck_names if name in name_to_id}
-
-    for target_file in target_files:
-        output_file = target_file.replace(".conf", "_filtered.conf")
-
-        with open(target_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for line in lines:
-                if not any(card_id in line for card_id in extra_deck_ids):
-                    f.write(line)
-
-        print(f"Filtered file saved as {output_file}")
+    extra_deck_ids = {name_to_id.get(name) for name in extra_deck_names} - {None}
+
+    # Each target is streamed and filtered by exact ID in its own process
+    output_files = [target_file.replace(".conf", "_filtered.conf") for target_file in target_files]
+    with ProcessPoolExecutor() as pool:
+        removed_counts = pool.map(remove_ids, target_files, output_files, [extra_deck_ids] * len(target_files))
+        for output_file, removed in zip(output_files, removed_counts):
+            print(f"Filtered file saved as {output_file} ({removed} extra deck cards removed)")
 
 if __name__ == "__main__":
     if len(sys.argv) < 4:
@@ -1,60 +1,44 @@
+import argparse
 import os
-import json
-import re
-
-# Load card data from JSON file
-card_data_path = 'cardData.json'
-with open(card_data_path, 'r') as f:
-    card_data = json.load(f)
-
-# Regular expression to remove suffixes like (Manga), (Anime), (VG)
-suffix_pattern = re.compile(r'\s*\((manga|anime|vg)\)', re.IGNORECASE)
-
-# Create a dictionary to map normalized card names to card IDs
-name_to_id = {}
-for card in card_data:
-    # Remove suffixes like (Manga), (Anime), (VG) from card names
-    normalized_name = re.sub(suffix_pattern, '', card['name']).strip().lower()
-    name_to_id[normalized_name] = str(card['id']).strip()
-
-# Define the directory containing the images
-directory = 'DMVR Erratas'
-
-# List all files for debugging
-all_files = os.listdir(directory)
-print(f"All files in directory: {all_files}")  # Debugging: List all files
-
-# Iterate over each file in the directory
-for filename in all_files:
-    # Get the file name without extension
-    name, ext = os.path.splitext(filename)
-
-    # Skip non-image files (only handle .jpg and .png)
-    if ext.lower() not in ['.jpg', '.png']:
-        continue
-
-    # Normalize the name for matching (remove spaces, convert to lowercase)
-    normalized_name = name.strip().lower()
-
-    # Debugging: Log the current file being processed
-    print(f"Processing file: {filename} (normalized: {normalized_name})")
-
-    # Check if the card name exists in the JSON data
-    card_id = name_to_id.get(normalized_name)
-    if card_id:
-        # Create the new file name with the card ID, always using .png extension
-        new_filename = f"{card_id}.png"
-        old_filepath = os.path.join(directory, filename)
-        new_filepath = os.path.join(directory, new_filename)
-
-        # Rename the file if needed (if the name contains spaces or is different)
-        if old_filepath != new_filepath:
-            os.rename(old_filepath, new_filepath)
-            print(f"Renamed '{filename}' to '{new_filename}'")
-        else:
-            print(f"Verified '{filename}' is correctly named.")
-    else:
-        print(f"No matching entry found for card name '{name}', skipping...")
-
-# Debugging: Log completion of script
-print("Renaming process completed.")
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dmvr.artwork import CARD_SIZE, OUTPUT_FORMATS, Image, process_artwork
+from dmvr.carddump import load_name_index
+
+def parse_size(value):
+    """Parse "421x614" into (421, 614)."""
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rename card artwork to <card id>.png and convert it for EDOPro.")
+    parser.add_argument("directory", nargs="?", default="DMVR Erratas",
+                        help="folder with the artwork (default: DMVR Erratas)")
+    parser.add_argument("--card-data", default="cardData.json", help="card dump used to match names to IDs")
+    parser.add_argument("--out", help="write the pictures here and keep the originals (default: convert in place)")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="png", help="output format (default: png)")
+    parser.add_argument("--size", type=parse_size, default=CARD_SIZE,
+                        help=f"output size as WIDTHxHEIGHT (default: {CARD_SIZE[0]}x{CARD_SIZE[1]})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be renamed or converted")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow is not installed: pictures can only be renamed, not converted (pip install Pillow).")
+
+    # Card names are matched without suffixes like (Manga), (Anime), (VG) and case-insensitively
+    name_to_id = load_name_index(args.card_data)
+    summary = process_artwork(args.directory, name_to_id, out_dir=args.out, output_format=args.format,
+                              size=args.size, dry_run=args.dry_run, workers=args.workers)
+
+    for filename in summary["unmatched"]:
+        print(f"No matching entry found for card name '{os.path.splitext(filename)[0]}', skipping...")
+    print(f"{summary['converted']} converted, {summary['resized']} resized, "
+          f"{summary['renamed'] + summary['copied']} renamed, {summary['verified']} already correct, "
+          f"{summary['skipped']} unchanged since the last run, {len(summary['unmatched'])} unmatched, "
+          f"{len(summary['failed'])} failed.")
+    print("Renaming process completed.")
+
+if __name__ == "__main__":
+    main()
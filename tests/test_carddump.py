@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+from dmvr import carddump
+
+
+class CardIndexSidecarTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dump = os.path.join(self.tmp.name, "cardData.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_dump(self, data):
+        with open(self.dump, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def assertSameIndex(self, cold, warm):
+        self.assertEqual((warm.ids, warm.names, warm.extra_deck, warm.typed),
+                         (cold.ids, cold.names, cold.extra_deck, cold.typed))
+
+    def test_untyped_dump_round_trips(self):
+        self.write_dump([{"id": 46986414, "name": "Dark Magician"}, {"id": "89631139", "name": "Blue-Eyes\nWhite"}])
+        cold = carddump.load_card_index(self.dump)
+        self.assertTrue(os.path.exists(self.dump + carddump.INDEX_SUFFIX))
+        self.assertEqual(cold.ids, [46986414, "89631139"])
+        self.assertFalse(cold.typed)
+        self.assertSameIndex(cold, carddump.load_card_index(self.dump))
+
+    def test_typed_dump_streamed_or_whole_gives_the_same_index(self):
+        self.write_dump({"data": [
+            {"id": 1, "name": "Fusion A", "type": "Fusion Monster", "card_sets": [{"set_name": "x"}]},
+            {"id": 2, "name": "Normal B", "frameType": "normal"},
+        ]})
+        whole = carddump.load_card_index(self.dump, cache=False)
+        self.assertEqual((whole.extra_deck, whole.typed), ({"1"}, True))
+        size, carddump.WHOLE_DUMP_SIZE = carddump.WHOLE_DUMP_SIZE, 0
+        try:
+            streamed = carddump.load_card_index(self.dump, cache=False)
+        finally:
+            carddump.WHOLE_DUMP_SIZE = size
+        self.assertSameIndex(whole, streamed)
+        self.assertSameIndex(carddump.load_card_index(self.dump), carddump.load_card_index(self.dump))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import tempfile
+import unittest
+
+from dmvr.export import ListVariant, export_variants
+
+
+class ExportOrderTest(unittest.TestCase):
+    def test_cards_are_sorted_by_name_key(self):
+        cards = [
+            ("3", "red", "1", False, "b. skull dragon"),
+            ("2", "red", "1", False, "Black Luster Soldier"),
+            ("1", "red", "1", False, "Black Skull Dragon (Anime)"),
+            ("4", "red", "1", False, "black dragon's chick"),
+        ]
+        variant = ListVariant("red.conf", "RED", ["red"])
+        with tempfile.TemporaryDirectory() as out_dir:
+            export_variants(cards, out_dir, [variant])
+            with open(os.path.join(out_dir, "red.conf"), encoding="utf-8") as f:
+                ids = [line.split()[0] for line in f if line[:1].isdigit()]
+        self.assertEqual(ids, ["4", "2", "1", "3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from dmvr import metrics
+
+
+class MixedLabelValuesTest(unittest.TestCase):
+    def setUp(self):
+        metrics.disable()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_int_and_str_values_of_one_label(self):
+        # fetch.query() counts HTTP status codes and "error" under the same label
+        metrics.count("ygoprodeck_responses_total", status=200)
+        metrics.count("ygoprodeck_responses_total", status="error")
+        metrics.count("ygoprodeck_responses_total", status=200)
+        metrics.observe("request_seconds", 0.5, status=429)
+        metrics.observe("request_seconds", 0.25, status="error")
+
+        counters = {counter["labels"]["status"]: counter["value"] for counter in metrics.report()["counters"]}
+        self.assertEqual(counters, {"200": 2, "error": 1})
+        text = metrics.prometheus_text()
+        self.assertIn('dmvr_ygoprodeck_responses_total{script="', text)
+        self.assertIn('status="error"} 1', text)
+        self.assertIn('status="200"} 2', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from dmvr.pipeline import stage_merge
+from dmvr.validate import validate_entries
+
+
+class UnresolvedExtraDeckTest(unittest.TestCase):
+    def merge(self):
+        resolve_lists = {"not_found": [], "red": [("46986414", "Dark Magician")], "blue": [], "white": []}
+        pool_white = {"cards": [], "not_found": []}
+        extra_deck = {
+            "red": [("00000000", "Unknown Fusion"), ("00000000", "Unknown Synchro"), ("00000000", "unknown fusion")],
+            "blue": [],
+            "white": [],
+        }
+        return stage_merge(None, resolve_lists, pool_white, extra_deck, {"Dark Magician": "1"})
+
+    def test_each_unresolved_name_keeps_its_entry(self):
+        merge = self.merge()
+        self.assertEqual(merge["red"], [
+            ("46986414", "1", "Dark Magician"),
+            ("00000000", "3", "Unknown Fusion"),
+            ("00000000", "3", "Unknown Synchro"),
+        ])
+
+    def test_every_placeholder_is_reported(self):
+        merge = self.merge()
+        report = validate_entries({colour: merge[colour] for colour in ("red", "blue", "white")}, [])
+        self.assertEqual([name for _, _, _, name in report.placeholders], ["Unknown Fusion", "Unknown Synchro"])
+        self.assertFalse(report.ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
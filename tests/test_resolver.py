@@ -0,0 +1,56 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from dmvr import resolver
+from dmvr.fetch import LOOKUP_FAILED
+
+
+class FailingClient:
+    """Stands in for YgoprodeckClient when the API cannot be reached."""
+
+    def lookup(self, name, fuzzy=True):
+        return None, LOOKUP_FAILED
+
+    def lookup_many(self, names, fuzzy=True):
+        return [self.lookup(name, fuzzy) for name in names]
+
+
+class LookupFailedTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = resolver.CardIdCache(":memory:")
+        for target, value in (("_default_client", FailingClient()), ("_offline_index", None),
+                              ("get_card_id_locally", lambda name: (None, None))):
+            patcher = mock.patch.object(resolver, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(resolver, "suggest_names")
+        self.suggest_names = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def resolve(self, function, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = function(*args, cache=self.cache)
+        return result, output.getvalue()
+
+    def test_resolve_many_reports_network_failures_separately(self):
+        ids, output = self.resolve(resolver.resolve_many, ["Dark Magician", "Dark Magician"])
+        self.assertEqual(ids, [None, None])
+        self.assertNotIn("Card ID not found", output)
+        self.assertEqual(output.count("could not be reached"), 1)
+        self.suggest_names.assert_not_called()
+        self.assertIsNone(self.cache.get("Dark Magician"))
+
+    def test_get_card_id_reports_network_failures_separately(self):
+        card_id, output = self.resolve(resolver.get_card_id, "Dark Magician")
+        self.assertIsNone(card_id)
+        self.assertNotIn("Card ID not found", output)
+        self.assertIn("could not be reached", output)
+        self.suggest_names.assert_not_called()
+        self.assertIsNone(self.cache.get("Dark Magician"))
+
+
+if __name__ == "__main__":
+    unittest.main()
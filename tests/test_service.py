@@ -0,0 +1,19 @@
+import unittest
+
+from dmvr.service import INVALID_ID, PoolService, parse_card_id
+
+
+class CardIdTest(unittest.TestCase):
+    def test_only_ints_and_digit_strings_are_ids(self):
+        self.assertEqual(parse_card_id(83764719), 83764719)
+        self.assertEqual(parse_card_id("03657444"), 3657444)
+        for card_id in (1.0, 1.9, True, False, None, "1.9", "-1", " 1", "", "١٢"):
+            self.assertIsNone(parse_card_id(card_id), card_id)
+
+    def test_invalid_ids_get_an_error_entry(self):
+        service = PoolService({})
+        self.assertEqual(service.lookup(ids=[1, True, 1.9]), {"ids": [None, INVALID_ID, INVALID_ID], "names": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from dmvr.validate import validate_entries
+
+
+class DuplicateEntriesTest(unittest.TestCase):
+    def test_same_card_twice_in_one_colour_is_only_a_warning(self):
+        lists = {"blue": [("03657444", "3", "Cyber Valley"), ("03657444", "3", "Cyber Valley (Anime)")]}
+        report = validate_entries(lists, [])
+        self.assertEqual(report.repeats, [(3657444, [("blue", "Cyber Valley"), ("blue", "Cyber Valley (Anime)")])])
+        self.assertEqual(report.duplicates, [])
+        self.assertTrue(report.ok)
+
+    def test_one_id_under_two_names_fails(self):
+        lists = {"red": [("83764719", "3", "Monster Reborn")], "white": [("83764719", "3", "Pot of Greed")]}
+        report = validate_entries(lists, [])
+        self.assertEqual(len(report.duplicates), 1)
+        self.assertFalse(report.ok)
+
+    def test_one_card_in_two_colours_is_left_to_precedence(self):
+        lists = {"red": [("83764719", "3", "Monster Reborn")], "white": [("83764719", "3", "Monster Reborn")]}
+        report = validate_entries(lists, [])
+        self.assertEqual((report.duplicates, report.repeats), ([], []))
+        self.assertTrue(report.ok)
+
+
+if __name__ == "__main__":
+    unittest.main()